@@ -13,6 +13,7 @@ from .processor import (
     format_time,
     get_parser_stats,
     reset_parser_stats,
+    warm_up_executor,
 )
 from .normal_settings import NormalSettings
 
@@ -29,4 +30,5 @@ __all__ = [
     'format_time',
     'get_parser_stats',
     'reset_parser_stats',
+    'warm_up_executor',
 ]
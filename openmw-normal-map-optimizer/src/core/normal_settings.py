@@ -89,6 +89,9 @@ class NormalSettings(BaseProcessingSettings):
     # Passthrough output control
     copy_passthrough_files: bool = False  # Copy well-compressed files to output (vs skip them)
 
+    # Incremental processing
+    skip_unchanged_files: bool = False  # Skip files whose output from a previous run is up to date
+
     # Path filtering
     path_whitelist: list = None  # Default: ["Textures"]
     path_blacklist: list = None  # Default: folders to exclude entirely
@@ -122,6 +125,7 @@ class NormalSettings(BaseProcessingSettings):
             'auto_optimize_n_alpha': self.auto_optimize_n_alpha,
             'allow_compressed_passthrough': self.allow_compressed_passthrough,
             'copy_passthrough_files': self.copy_passthrough_files,
+            'skip_unchanged_files': self.skip_unchanged_files,
             'path_whitelist': self.path_whitelist,
             'path_blacklist': self.path_blacklist,
             'custom_blacklist': self.custom_blacklist,
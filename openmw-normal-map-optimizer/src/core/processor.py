@@ -6,14 +6,21 @@ This module uses the shared core from openmw-texture-optimizer-core.
 """
 
 from pathlib import Path
+from dataclasses import dataclass
 import subprocess
 import shutil
-from concurrent.futures import ProcessPoolExecutor, as_completed
-import platform
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from typing import Optional, Tuple, List, Dict, Callable
 import sys
 import json
 import importlib.util
+import os
+import re
+from functools import lru_cache
+from collections import deque
+import heapq
+import threading
+import time
 
 # =============================================================================
 # Shared Core Import
@@ -63,6 +70,8 @@ _utils = _import_shared_module("utils")
 parse_dds_header = _dds_parser.parse_dds_header
 get_parser_stats = _dds_parser.get_parser_stats
 reset_parser_stats = _dds_parser.reset_parser_stats
+_increment_fast_parser_hits = _dds_parser._increment_fast_parser_hits
+_increment_texdiag_fallbacks = _dds_parser._increment_texdiag_fallbacks
 convert_bgrx32_to_bgr24 = _dds_parser.convert_bgrx32_to_bgr24
 FileScanner = _file_scanner.FileScanner
 ProcessingResult = _base_settings.ProcessingResult
@@ -82,224 +91,518 @@ from .normal_settings import NormalSettings
 # Get tool paths - pass the optimizer's root directory
 # This file is at: openmw-normal-map-optimizer/src/core/processor.py
 # Tools are at: openmw-normal-map-optimizer/tools/
-_optimizer_root = Path(__file__).parent.parent.parent
+_optimizer_root = Path(__file__).resolve().parent.parent.parent
 _TEXCONV_EXE, _TEXDIAG_EXE, _ = get_tool_paths(_optimizer_root)
 TEXCONV_EXE = _TEXCONV_EXE
 TEXDIAG_EXE = _TEXDIAG_EXE
 
+# Spawn tools from a fixed working directory with absolute paths (no PATH search),
+# and without opening a console window per call on Windows
+_TOOL_CWD = str(Path(TEXCONV_EXE).parent) if Path(TEXCONV_EXE).parent.is_dir() else None
+_SUBPROCESS_FLAGS = subprocess.CREATE_NO_WINDOW if sys.platform == 'win32' else 0
+
 # Fast parser is always available (via shared core)
 _HAS_FAST_PARSER = True
 
+# texdiag is only used for headers the fast parser can't read
+_HAS_TEXDIAG = Path(TEXDIAG_EXE).is_file()
+
+# texdiag info prints width, height, ... format in that order (matched on raw bytes)
+_RE_TEXDIAG_INFO = re.compile(rb'width\s*=\s*(\d+).*?height\s*=\s*(\d+).*?format\s*=\s*(\S+)', re.S)
+
+# Format groups used by the per-file format decisions
+_COMPRESSED_FORMATS = frozenset({"BC5/ATI2", "BC3/DXT5", "BC1/DXT1"})
+_NO_ALPHA_COMPRESSED_FORMATS = frozenset({"BC5/ATI2", "BC1/DXT1"})
+_NO_ALPHA_FORMATS = frozenset({"BGR", "BC5/ATI2", "BC1/DXT1"})
+_BC_OPTION_FORMATS = frozenset({"BC1/DXT1", "BC3/DXT5"})
+
+# Written to the output directory: what produced each output file, so unchanged
+# files can be skipped on the next run
+_MANIFEST_NAME = ".normal_map_optimizer_manifest.json"
+
+# Settings that change texconv's output for an otherwise identical file plan
+_ENCODE_SETTING_KEYS = ('invert_y', 'reconstruct_z', 'uniform_weighting', 'use_dithering',
+                        'resize_method', 'enforce_power_of_2')
+
+# Bits per pixel for each output format (used for size projections)
+_BPP_MAP = {
+    "BC5/ATI2": 8,
+    "BC3/DXT5": 8,
+    "BC1/DXT1": 4,
+    "BGRA": 32,
+    "BGR": 24
+}
+
 
 # =============================================================================
 # DDS Info Helper (uses shared parser, with texdiag fallback)
 # =============================================================================
 
-def _get_dds_info(input_dds: Path) -> Tuple[Optional[Tuple[int, int]], str]:
+def _get_dds_info(input_dds: Path,
+                  file_stat: Optional[Tuple[int, int]] = None) -> Tuple[Optional[Tuple[int, int]], str]:
     """
     Get dimensions and format from DDS file using the shared fast parser.
 
+    Results are memoized per process, so analysis and processing of the same
+    file only parse its header once. file_stat is (size, mtime_ns) from the
+    directory scan; if omitted the file is stat'ed here.
+
     Returns:
         ((width, height), format_string) or (None, "UNKNOWN") on error
     """
+    if file_stat is None:
+        try:
+            st = input_dds.stat()
+        except OSError:
+            return None, "UNKNOWN"
+        file_stat = (st.st_size, st.st_mtime_ns)
+
+    dims, fmt, from_texdiag = _read_dds_info(str(input_dds), file_stat[1], file_stat[0])
+
+    # Counted on every call, cached or not, so each dry run reports its own stats
+    if dims is not None:
+        if from_texdiag:
+            _increment_texdiag_fallbacks()
+        else:
+            _increment_fast_parser_hits()
+    return dims, fmt
+
+
+# Keyed on (path, mtime_ns, size) so edited files are re-read; bounded because
+# the GUI process and pool workers live across many re-analyses
+@lru_cache(maxsize=32768)
+def _read_dds_info(path_str: str, mtime_ns: int, size: int) -> Tuple[Optional[Tuple[int, int]], str, bool]:
+    """
+    Memoized header read behind _get_dds_info.
+
+    Returns (dimensions, format, from_texdiag); from_texdiag tells the caller
+    which parser stat to count.
+    """
+    input_dds = Path(path_str)
     try:
         dims, fmt = parse_dds_header(input_dds)
         if dims is not None and fmt != "UNKNOWN":
             # Normalize format to friendly name
-            return dims, normalize_format(fmt)
+            return dims, normalize_format(fmt), False
     except Exception:
         pass
 
-    return None, "UNKNOWN"
+    if _HAS_TEXDIAG:
+        dims, fmt = _get_dds_info_texdiag(input_dds)
+        return dims, fmt, True
+    return None, "UNKNOWN", False
+
 
+def _get_dds_info_texdiag(input_dds: Path) -> Tuple[Optional[Tuple[int, int]], str]:
+    """
+    Fallback for headers the fast parser rejects: ask texdiag.
+
+    Returns:
+        ((width, height), format_string) or (None, "UNKNOWN") on error
+    """
+    try:
+        result = subprocess.run(
+            [TEXDIAG_EXE, "info", "-nologo", str(input_dds.absolute())],
+            capture_output=True, timeout=30,
+            cwd=_TOOL_CWD, creationflags=_SUBPROCESS_FLAGS
+        )
+        if result.returncode != 0:
+            return None, "UNKNOWN"
 
-def _get_dimensions(input_dds: Path) -> Optional[Tuple[int, int]]:
-    """Get dimensions from DDS file. Returns (width, height) or None"""
-    dimensions, _ = _get_dds_info(input_dds)
-    return dimensions
+        match = _RE_TEXDIAG_INFO.search(result.stdout)
+        if not match:
+            return None, "UNKNOWN"
 
+        return (int(match.group(1)), int(match.group(2))), normalize_format(match.group(3).decode('ascii', 'replace'))
+    except Exception:
+        return None, "UNKNOWN"
+
+
+@lru_cache(maxsize=256)
+def _estimate_output_size(width: int, height: int, target_format: str) -> int:
+    """
+    Estimate output file size in bytes (with mipmaps and header).
+
+    Sums the actual mip chain down to 1x1, with BC formats padded to whole
+    4x4 blocks, plus the 128-byte DDS header texconv writes with -dx9.
+    Cached because most files in a mod share the same dimensions and format.
+    """
+    bpp = _BPP_MAP.get(target_format, 32)
+    is_block_compressed = target_format in _COMPRESSED_FORMATS
+
+    total_bytes = 0
+    w, h = width, height
+    while True:
+        if is_block_compressed:
+            # 16 pixels per block -> 2 * bpp bytes per block
+            total_bytes += ((w + 3) // 4) * ((h + 3) // 4) * bpp * 2
+        else:
+            total_bytes += (w * h * bpp) // 8
+        if w == 1 and h == 1:
+            break
+        w, h = max(1, w // 2), max(1, h // 2)
 
-def _get_format(input_dds: Path) -> str:
-    """Get format from DDS file. Returns format string or 'UNKNOWN'"""
-    _, format_str = _get_dds_info(input_dds)
-    return format_str
+    return total_bytes + 128
 
 
 # =============================================================================
 # Normal Map Processing Logic
 # =============================================================================
 
-def _process_normal_map(input_dds: Path, output_dds: Path, is_nh: bool, settings: dict) -> bool:
-    """Process a single normal map file using texconv."""
-    try:
-        output_dds.parent.mkdir(parents=True, exist_ok=True)
+# texconv prints a line per file plus warnings; only keep the tail for errors
+_TEXCONV_OUTPUT_TAIL = 200
+_TEXCONV_ERROR_LINES = 5
 
-        # Get both dimensions and format
-        dimensions, format_name = _get_dds_info(input_dds)
-        if not dimensions:
-            return False
+# Limits for converting several files in one texconv call. Windows caps a
+# command line at 32767 characters.
+_TEXCONV_MAX_FILES_PER_CALL = 32
+_TEXCONV_MAX_CMDLINE_CHARS = 30000
 
-        orig_width, orig_height = dimensions
-        new_width, new_height = calculate_new_dimensions(orig_width, orig_height, settings, input_dds)
-
-        # Check for compressed passthrough (fast path - just copy the file)
-        if settings.get('allow_compressed_passthrough', False):
-            will_resize = (new_width != orig_width) or (new_height != orig_height)
-
-            if not will_resize:
-                current_format = normalize_format(format_name)
-
-                if current_format in ['BC5/ATI2', 'BC3/DXT5', 'BC1/DXT1']:
-                    can_passthrough = False
-                    needs_rename = False
-
-                    # Check for mislabeling (NH textures without alpha)
-                    if is_nh and settings.get('auto_fix_nh_to_n', True):
-                        if current_format in ['BC5/ATI2', 'BC1/DXT1']:
-                            can_passthrough = True
-                            needs_rename = True
-                        elif current_format == 'BC3/DXT5':
-                            can_passthrough = True
-                            needs_rename = False
-                    else:
-                        # N texture - check for wasted alpha
-                        if settings.get('auto_optimize_n_alpha', True):
-                            if current_format == 'BC3/DXT5':
-                                can_passthrough = False
-                            else:
-                                can_passthrough = True
-                        else:
-                            can_passthrough = True
-
-                    if can_passthrough:
-                        # Only copy if copy_passthrough_files is enabled
-                        if settings.get('copy_passthrough_files', False):
-                            if needs_rename:
-                                output_path_str = str(output_dds)
-                                if output_path_str.lower().endswith('_nh.dds'):
-                                    corrected_output = Path(output_path_str[:-7] + '_n.dds')
-                                    corrected_output.parent.mkdir(parents=True, exist_ok=True)
-                                    shutil.copy2(input_dds, corrected_output)
-                            else:
-                                shutil.copy2(input_dds, output_dds)
-                        # Return True either way - passthrough means "no processing needed"
-                        return True
-
-        # Check if we're resizing
-        will_resize = (new_width != orig_width) or (new_height != orig_height)
-
-        # Normalize format for comparison
-        current_format = normalize_format(format_name)
+# Time allowed per file; a shared texconv call gets this for each of its files
+_TEXCONV_TIMEOUT_PER_FILE = 300
 
-        # Determine target format with smart format handling
-        target_format = settings['nh_format'] if is_nh else settings['n_format']
-
-        # Auto-fix: NH-labeled textures with no-alpha formats should be treated as N
-        if is_nh and settings.get('auto_fix_nh_to_n', True):
-            if current_format in ['BGR', 'BC5/ATI2', 'BC1/DXT1']:
-                target_format = settings['n_format']
-                is_nh = False
-
-        # Preserve compressed format when not resizing
-        should_preserve = False
-        if settings.get('preserve_compressed_format', True) and not will_resize:
-            compressed_formats = ['BC5/ATI2', 'BC3/DXT5', 'BC1/DXT1']
-            if current_format in compressed_formats:
-                if is_nh:
-                    if current_format == 'BC3/DXT5':
-                        should_preserve = True
-                else:
-                    if current_format in ['BC5/ATI2', 'BC1/DXT1']:
-                        should_preserve = True
-
-                if should_preserve:
-                    target_format = current_format
-
-        # Auto-optimize: N textures with alpha formats can be optimized
-        if not is_nh and settings.get('auto_optimize_n_alpha', True) and not should_preserve:
-            if current_format == 'BGRA':
-                target_format = settings['n_format']
-            elif current_format == 'BC3/DXT5':
-                target_format = 'BC1/DXT1'
-
-        # Small texture override (only for uncompressed sources)
-        if settings.get('use_small_texture_override', True):
-            is_already_compressed = current_format in ['BC5/ATI2', 'BC3/DXT5', 'BC1/DXT1']
-
-            if not is_already_compressed:
-                min_dim = min(new_width, new_height)
-                if is_nh:
-                    threshold = settings.get('small_nh_threshold', 256)
-                    if threshold > 0 and min_dim <= threshold:
-                        target_format = "BGRA"
-                else:
-                    threshold = settings.get('small_n_threshold', 128)
-                    if threshold > 0 and min_dim <= threshold:
-                        target_format = "BGR"
+# Output mtimes are compared to the start of a texconv call with this much
+# slack, for filesystems with coarse timestamps (FAT: 2 s)
+_MTIME_SLACK_NS = 2_000_000_000
 
-        texconv_format = FORMAT_MAP[target_format]
 
-        # Build texconv command
-        cmd = [
-            TEXCONV_EXE,
-            "-f", texconv_format,
-            "-m", "0",
-            "-alpha",     # Straight alpha (not premultiplied)
-            "-sepalpha",  # Process alpha separately during mipmap generation
-            "-dx9"
-        ]
+def _run_texconv(cmd: List[str], timeout: int = _TEXCONV_TIMEOUT_PER_FILE) -> Tuple[int, List[str]]:
+    """
+    Run texconv, reading its combined stdout/stderr line by line.
 
-        if settings.get('invert_y', False):
-            cmd.append("-inverty")
+    Only the last _TEXCONV_OUTPUT_TAIL lines are kept, so memory stays flat
+    no matter how much texconv prints. The process is killed after timeout.
 
-        if target_format != "BC5/ATI2" and settings.get('reconstruct_z', True):
-            cmd.append("-reconstructz")
+    Returns:
+        (returncode, output_tail)
+    """
+    tail = deque(maxlen=_TEXCONV_OUTPUT_TAIL)
+    with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                          text=True, errors='replace', cwd=_TOOL_CWD,
+                          creationflags=_SUBPROCESS_FLAGS) as proc:
+        timer = threading.Timer(timeout, proc.kill)
+        timer.start()
+        try:
+            for line in proc.stdout:
+                tail.append(line.rstrip())
+            proc.wait()
+        finally:
+            timer.cancel()
+    return proc.returncode, list(tail)
+
+
+@dataclass
+class _OutputPlan:
+    """Resolved output for one file (dimensions, format, passthrough)"""
+    new_width: int
+    new_height: int
+    target_format: str
+    is_passthrough: bool = False
+    needs_rename: bool = False  # Passthrough copy is written under the _n name
+    # Only used for analysis warnings
+    is_nh: bool = False  # After auto-fix (False if an NH-labeled file is treated as N)
+    should_preserve: bool = False
+
+
+def _needs_nh_rename(current_format: str, original_is_nh: bool, settings: dict) -> bool:
+    """NH-labeled texture stored without alpha, which auto-fix turns into an _n file"""
+    return (original_is_nh and settings.get('auto_fix_nh_to_n', True)
+            and current_format in _NO_ALPHA_COMPRESSED_FORMATS)
+
+
+# Settings that calculate_new_dimensions reads
+_DIMENSION_SETTING_KEYS = ('scale_factor', 'min_resolution', 'max_resolution',
+                           'enable_atlas_downscaling', 'atlas_max_resolution',
+                           'enforce_power_of_2')
+
+
+@lru_cache(maxsize=256)
+def _cached_new_dimensions(width: int, height: int, is_atlas: bool,
+                           dimension_settings: tuple) -> Tuple[int, int]:
+    """calculate_new_dimensions keyed on the settings it reads; most files share a few sizes"""
+    return calculate_new_dimensions(width, height, dict(dimension_settings), is_atlas=is_atlas)
+
+
+def _resolve_output(width: int, height: int, current_format: str, is_nh: bool,
+                    settings: dict, is_atlas: bool = False) -> _OutputPlan:
+    """
+    Decide output dimensions, target format and compressed passthrough for one file.
+
+    Shared by analysis and processing, so the dry run always predicts exactly
+    what processing will do.
+    """
+    original_is_nh = is_nh
+    dimension_settings = tuple((key, settings[key]) for key in _DIMENSION_SETTING_KEYS if key in settings)
+    new_width, new_height = _cached_new_dimensions(width, height, is_atlas, dimension_settings)
+    will_resize = (new_width != width) or (new_height != height)
+
+    # Determine target format with smart format handling
+    target_format = settings['nh_format'] if is_nh else settings['n_format']
+
+    # Auto-fix: NH-labeled textures with no-alpha formats should be treated as N
+    if is_nh and settings.get('auto_fix_nh_to_n', True):
+        if current_format in _NO_ALPHA_FORMATS:
+            target_format = settings['n_format']
+            is_nh = False
+
+    # Preserve compressed format when not resizing
+    should_preserve = False
+    if settings.get('preserve_compressed_format', True) and not will_resize:
+        if current_format in _COMPRESSED_FORMATS:
+            if is_nh:
+                if current_format == 'BC3/DXT5':
+                    should_preserve = True
+            else:
+                if current_format in _NO_ALPHA_COMPRESSED_FORMATS:
+                    should_preserve = True
+
+            if should_preserve:
+                target_format = current_format
+
+    # Auto-optimize: N textures with alpha formats can be optimized
+    if not is_nh and settings.get('auto_optimize_n_alpha', True) and not should_preserve:
+        if current_format == 'BGRA':
+            target_format = settings['n_format']
+        elif current_format == 'BC3/DXT5':
+            target_format = 'BC1/DXT1'
+
+    # Small texture override (only for uncompressed sources)
+    if settings.get('use_small_texture_override', True):
+        is_already_compressed = current_format in _COMPRESSED_FORMATS
+
+        if not is_already_compressed:
+            min_dim = min(new_width, new_height)
+            if is_nh:
+                threshold = settings.get('small_nh_threshold', 256)
+                if threshold > 0 and min_dim <= threshold:
+                    target_format = "BGRA"
+            else:
+                threshold = settings.get('small_n_threshold', 128)
+                if threshold > 0 and min_dim <= threshold:
+                    target_format = "BGR"
+
+    # Compressed passthrough: already-compressed files that aren't resized are
+    # copied as-is, except N textures wasting alpha in BC3 when auto-optimize is on
+    is_passthrough = False
+    needs_rename = False
+    if settings.get('allow_compressed_passthrough', False) and not will_resize:
+        if current_format in _COMPRESSED_FORMATS:
+            wasted_alpha = (not original_is_nh and settings.get('auto_optimize_n_alpha', True)
+                            and current_format == 'BC3/DXT5')
+            if not wasted_alpha:
+                is_passthrough = True
+                needs_rename = _needs_nh_rename(current_format, original_is_nh, settings)
+                target_format = current_format
+
+    return _OutputPlan(
+        new_width=new_width,
+        new_height=new_height,
+        target_format=target_format,
+        is_passthrough=is_passthrough,
+        needs_rename=needs_rename,
+        is_nh=is_nh,
+        should_preserve=should_preserve,
+    )
 
-        # Force BC1 to fully opaque mode (no punch-through alpha)
-        # This prevents unused alpha data from triggering DXT1a transparency
-        if target_format == "BC1/DXT1":
-            cmd.extend(["-at", "0"])
 
-        if target_format in ["BC1/DXT1", "BC3/DXT5"]:
-            bc_options = ""
-            if settings.get('uniform_weighting', True):
-                bc_options += "u"
-            if settings.get('use_dithering', False):
-                bc_options += "d"
-            if bc_options:
-                cmd.extend(["-bc", bc_options])
+def _run_texconv_quiet(cmd: List[str], timeout: int = _TEXCONV_TIMEOUT_PER_FILE) -> int:
+    """
+    Run texconv with its output discarded. Returns the exit code.
 
-        if new_width != orig_width or new_height != orig_height:
-            cmd.extend(["-w", str(new_width), "-h", str(new_height)])
+    Raises subprocess.TimeoutExpired (after killing texconv) on timeout.
+    """
+    return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                          timeout=timeout, cwd=_TOOL_CWD,
+                          creationflags=_SUBPROCESS_FLAGS).returncode
 
-            resize_method = str(settings.get('resize_method', 'CUBIC')).split()[0]
-            if resize_method in FILTER_MAP:
-                cmd.extend(["-if", FILTER_MAP[resize_method]])
 
-        if settings.get('enforce_power_of_2', False):
-            cmd.append("-pow2")
+@lru_cache(maxsize=16)
+def _resize_filter(resize_method) -> Optional[str]:
+    """texconv -if value for a GUI resize method label like "CUBIC (Recommended ...)", or None"""
+    return FILTER_MAP.get(str(resize_method).split()[0])
 
-        cmd.extend(["-o", str(output_dds.parent), "-y", str(input_dds)])
 
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+def _texconv_options(settings: dict, plan: _OutputPlan, dimensions: Tuple[int, int],
+                     in_pool: bool = False) -> List[str]:
+    """
+    texconv arguments for one file, without -o and input paths.
 
-        if result.returncode != 0:
-            return False
+    Files with identical options and output directory can share one texconv call.
+    in_pool is True when texconv runs inside a process pool worker.
+    """
+    orig_width, orig_height = dimensions
+    target_format = plan.target_format
+
+    options = [
+        "-f", FORMAT_MAP[target_format],
+        "-m", "0",
+        "-alpha",     # Straight alpha (not premultiplied)
+        "-sepalpha",  # Process alpha separately during mipmap generation
+        "-dx9"
+    ]
+
+    if settings.get('invert_y', False):
+        options.append("-inverty")
+
+    if target_format != "BC5/ATI2" and settings.get('reconstruct_z', True):
+        options.append("-reconstructz")
+
+    # Force BC1 to fully opaque mode (no punch-through alpha)
+    # This prevents unused alpha data from triggering DXT1a transparency
+    if target_format == "BC1/DXT1":
+        options.extend(["-at", "0"])
+
+    if target_format in _BC_OPTION_FORMATS:
+        bc_options = ""
+        if settings.get('uniform_weighting', True):
+            bc_options += "u"
+        if settings.get('use_dithering', False):
+            bc_options += "d"
+        if bc_options:
+            options.extend(["-bc", bc_options])
+
+    if plan.new_width != orig_width or plan.new_height != orig_height:
+        options.extend(["-w", str(plan.new_width), "-h", str(plan.new_height)])
+
+        resize_filter = _resize_filter(settings.get('resize_method', 'CUBIC'))
+        if resize_filter:
+            options.extend(["-if", resize_filter])
+
+    if settings.get('enforce_power_of_2', False):
+        options.append("-pow2")
+
+    # The worker pool already runs one texconv per core; letting each
+    # instance spin up its own compression threads only causes contention.
+    # Sequential runs (including a single remaining file) keep all threads.
+    if in_pool and settings.get('max_workers', 1) > 1:
+        options.append("-singleproc")
+
+    return options
+
+
+def _finish_output(input_dds: Path, output_dds: Path, plan: _OutputPlan) -> dict:
+    """Rename/convert texconv's output for one file and return its output info"""
+    # texconv names its output after the input; rename only if that differs
+    # (os.replace overwrites atomically, no exists/unlink round trip)
+    generated_dds = output_dds.parent / input_dds.name
+    if generated_dds != output_dds:
+        os.replace(generated_dds, output_dds)
+
+    # Post-process: Convert 32-bit BGRX to true 24-bit BGR
+    # texconv outputs B8G8R8X8_UNORM (32-bit with padding) for BGR format
+    if plan.target_format == "BGR":
+        convert_bgrx32_to_bgr24(output_dds)
+
+    return {
+        'output_size': output_dds.stat().st_size,
+        'new_w': plan.new_width,
+        'new_h': plan.new_height,
+        'new_format': plan.target_format,
+    }
+
+
+def _renamed_nh_output(output_dds: Path) -> Path:
+    """Output path for an NH-labeled passthrough file that is saved as _n"""
+    output_path_str = str(output_dds)
+    if output_path_str.lower().endswith('_nh.dds'):
+        return Path(output_path_str[:-7] + '_n.dds')
+    return output_dds
+
+
+def _output_rel_path(rel_path: str, cached_analysis: dict, settings: dict) -> str:
+    """Output path of a file relative to the output dir, after any _nh -> _n rename"""
+    output_rel = Path(rel_path)
+    is_nh = output_rel.stem.lower().endswith('_nh')
+    if cached_analysis['is_passthrough'] and _needs_nh_rename(cached_analysis['format'], is_nh, settings):
+        output_rel = _renamed_nh_output(output_rel)
+    return str(output_rel)
+
+
+def _valid_manifest_entry(entry) -> bool:
+    """Whether a manifest entry has the fields and types _save_manifest writes"""
+    if not isinstance(entry, dict):
+        return False
+    new_dims = entry.get('new_dims')
+    return (isinstance(entry.get('key'), str)
+            and isinstance(entry.get('output'), str) and entry['output'] != ''
+            and isinstance(entry.get('output_size'), int)
+            and isinstance(entry.get('output_mtime_ns'), int)
+            and isinstance(new_dims, list) and len(new_dims) == 2
+            and all(isinstance(d, int) for d in new_dims)
+            and isinstance(entry.get('new_format'), str))
+
+
+def _is_within(path: Path, root: Path) -> bool:
+    """Whether path (after resolving .. and links) is inside root"""
+    try:
+        path.resolve().relative_to(root.resolve())
+        return True
+    except (OSError, ValueError, RuntimeError):
+        return False
 
-        # Rename output file if needed
-        generated_dds = output_dds.parent / input_dds.name
-        if generated_dds != output_dds:
-            if output_dds.exists():
-                output_dds.unlink()
-            generated_dds.rename(output_dds)
 
-        # Post-process: Convert 32-bit BGRX to true 24-bit BGR
-        # texconv outputs B8G8R8X8_UNORM (32-bit with padding) for BGR format
-        if target_format == "BGR":
-            convert_bgrx32_to_bgr24(output_dds)
+def _process_normal_map(input_dds: Path, output_dds: Path, settings: dict,
+                        dimensions: Tuple[int, int], current_format: str, plan: _OutputPlan,
+                        in_pool: bool = False):
+    """
+    Process a single normal map file using texconv.
 
-        return True
+    dimensions and current_format are the source header info, and plan the
+    resolved output, all already computed by the caller. The output directory
+    must already exist (process_files creates them up front).
 
+    Returns:
+        False on failure, otherwise a dict with output_size, new_w, new_h and
+        new_format, so callers don't need to re-read the output file.
+    """
+    try:
+        orig_width, orig_height = dimensions
+
+        # Compressed passthrough (fast path - just copy the file)
+        if plan.is_passthrough:
+            output_size = 0
+            # Only copy if copy_passthrough_files is enabled
+            if settings.get('copy_passthrough_files', False):
+                if plan.needs_rename:
+                    corrected_output = _renamed_nh_output(output_dds)
+                    if corrected_output != output_dds:
+                        shutil.copy2(input_dds, corrected_output)
+                        output_size = corrected_output.stat().st_size
+                else:
+                    shutil.copy2(input_dds, output_dds)
+                    output_size = output_dds.stat().st_size
+            # Succeed either way - passthrough means "no processing needed"
+            return {
+                'output_size': output_size,
+                'new_w': orig_width,
+                'new_h': orig_height,
+                'new_format': current_format,
+            }
+
+        cmd = [TEXCONV_EXE] + _texconv_options(settings, plan, dimensions, in_pool)
+
+        # Absolute paths, since texconv runs from the tools directory
+        cmd.extend(["-o", str(output_dds.parent.absolute()), "-y", str(input_dds.absolute())])
+
+        # texconv's output is only useful when it fails, so don't pipe it on the
+        # normal path; re-run with output captured to report why it failed
+        try:
+            returncode = _run_texconv_quiet(cmd)
+        except subprocess.TimeoutExpired:
+            _discard_texconv_output(input_dds, output_dds)
+            raise RuntimeError(f"texconv timed out after {_TEXCONV_TIMEOUT_PER_FILE}s")
+        if returncode != 0:
+            returncode, output_tail = _run_texconv(cmd)
+
+        if returncode != 0:
+            last_lines = [line for line in output_tail if line.strip()][-_TEXCONV_ERROR_LINES:]
+            raise RuntimeError(f"texconv failed (exit code {returncode}): " + " | ".join(last_lines))
+
+        return _finish_output(input_dds, output_dds, plan)
+
+    except RuntimeError:
+        # texconv failure - let the worker report the output tail
+        raise
     except Exception:
         return False
 
@@ -310,19 +613,29 @@ def _process_normal_map(input_dds: Path, output_dds: Path, is_nh: bool, settings
 
 def _process_file_worker(args):
     """Worker function for parallel processing. Must be at module level for pickling."""
-    dds_file_path, source_dir_path, output_dir_path, is_nh, settings, cached_analysis = args
+    result, job = _prepare_file_task(args)
+    if job is not None:
+        _run_file_job(result, job, args[4])
+    return result
 
-    dds_file = Path(dds_file_path)
-    source_dir = Path(source_dir_path)
-    output_dir = Path(output_dir_path)
 
-    relative_path = dds_file.relative_to(source_dir)
-    output_file = output_dir / relative_path
+def _prepare_file_task(args):
+    """
+    Read header info and resolve the output plan for one task.
+
+    Returns (result, job). job is None when result is already final (skipped or
+    failed), otherwise (input, output, orig_dims, orig_format, plan) for
+    _run_file_job or a shared texconv call.
+    """
+    dds_file_path, relative_path, output_dir_path, is_nh, settings, cached_analysis, file_stat = args
+
+    dds_file = Path(dds_file_path)
+    output_file = Path(output_dir_path) / relative_path
 
     result = ProcessingResult(
         success=False,
-        relative_path=str(relative_path),
-        input_size=dds_file.stat().st_size
+        relative_path=relative_path,
+        input_size=file_stat[0]
     )
 
     try:
@@ -344,58 +657,272 @@ def _process_file_worker(args):
                                    cached_analysis.get('new_height', orig_dims[1]))
                 result.new_format = cached_analysis.get('target_format', orig_format)
                 result.output_size = 0  # No output file created
-                return result
+                return result, None
         else:
-            orig_dims, orig_format = _get_dds_info(dds_file)
+            orig_dims, orig_format = _get_dds_info(dds_file, file_stat)
             result.orig_dims = orig_dims
             result.orig_format = orig_format
 
-        if not result.orig_dims:
+        if not result.orig_dims or None in result.orig_dims:
             result.error_msg = "Could not determine dimensions"
-            return result
+            return result, None
+
+        if cached_analysis:
+            # Reuse the decisions made during analysis instead of recomputing them
+            plan = _OutputPlan(
+                new_width=cached_analysis['new_width'],
+                new_height=cached_analysis['new_height'],
+                target_format=cached_analysis['target_format'],
+                is_passthrough=cached_analysis['is_passthrough'],
+                needs_rename=(cached_analysis['is_passthrough']
+                              and _needs_nh_rename(orig_format, is_nh, settings)),
+            )
+        else:
+            plan = _resolve_output(orig_dims[0], orig_dims[1], orig_format, is_nh,
+                                   settings, is_texture_atlas(dds_file))
+
+        return result, (dds_file, output_file, orig_dims, orig_format, plan)
+
+    except Exception as e:
+        result.error_msg = str(e)
+
+    return result, None
 
-        success = _process_normal_map(dds_file, output_file, is_nh, settings)
 
-        if success:
+def _run_file_job(result: ProcessingResult, job: tuple, settings: dict, in_pool: bool = False):
+    """Process one prepared job with its own texconv call and fill in result"""
+    dds_file, output_file, orig_dims, orig_format, plan = job
+    try:
+        output_info = _process_normal_map(dds_file, output_file, settings,
+                                          orig_dims, orig_format, plan, in_pool)
+
+        if output_info:
             result.success = True
-            if output_file.exists():
-                result.output_size = output_file.stat().st_size
-                result.new_dims = _get_dimensions(output_file)
-                result.new_format = _get_format(output_file)
-            else:
-                # Passthrough case where copy was skipped but processing reported success
-                result.new_dims = (cached_analysis.get('new_width', result.orig_dims[0]),
-                                   cached_analysis.get('new_height', result.orig_dims[1])) if cached_analysis else result.orig_dims
-                result.new_format = cached_analysis.get('target_format', result.orig_format) if cached_analysis else result.orig_format
-                result.output_size = 0
+            result.output_size = output_info['output_size']
+            result.new_dims = (output_info['new_w'], output_info['new_h'])
+            result.new_format = output_info['new_format']
         else:
             result.error_msg = "Processing failed or output missing"
 
     except Exception as e:
         result.error_msg = str(e)
 
-    return result
+
+def _task_cost(cached_analysis: Optional[dict], file_stat: Tuple[int, int]) -> int:
+    """
+    Estimated relative cost of one processing task, for balancing batches.
+
+    texconv time scales with the pixels it encodes, so conversions are weighted
+    by output pixel count. Passthrough copies don't run texconv. Without cached
+    analysis (or for files analysis couldn't read), input bytes stand in,
+    which is about a byte per pixel for BC3/BC5.
+    """
+    if cached_analysis is None or not cached_analysis['new_width'] or not cached_analysis['new_height']:
+        return file_stat[0]
+    if cached_analysis['is_passthrough']:
+        return 0
+    return cached_analysis['new_width'] * cached_analysis['new_height']
+
+
+def _create_file_batches(tasks: List[tuple], costs: List[int], n_workers: int,
+                         batches_per_worker: int = 4) -> List[List[tuple]]:
+    """
+    Split tasks into roughly n_workers * batches_per_worker cost-balanced batches.
+
+    Tasks are placed most expensive first, each into the batch with the smallest
+    total cost so far (LPT), so batches end up with similar amounts of work and
+    the big files start first instead of straggling at the end of the run. Ties
+    go to the batch with fewer files, which spreads cheap files evenly.
+    """
+    n_batches = max(1, min(len(tasks), n_workers * batches_per_worker))
+    order = sorted(range(len(tasks)), key=lambda i: costs[i], reverse=True)
+
+    batches = [[] for _ in range(n_batches)]
+    heap = [(0, 0, b) for b in range(n_batches)]
+    for i in order:
+        total, count, b = heapq.heappop(heap)
+        batches[b].append(tasks[i])
+        heapq.heappush(heap, (total + costs[i], count + 1, b))
+    return batches
+
+
+def _group_texconv_jobs(pending: List[tuple], settings: dict) -> List[List[tuple]]:
+    """
+    Group (result, job) pairs that can share one texconv call.
+
+    texconv applies one set of options and one -o directory to every input, so
+    jobs are grouped by both, then split to keep each command line bounded.
+    """
+    groups: Dict[tuple, List[tuple]] = {}
+    for item in pending:
+        dds_file, output_file, orig_dims, _, plan = item[1]
+        key = (tuple(_texconv_options(settings, plan, orig_dims, in_pool=True)), output_file.parent)
+        groups.setdefault(key, []).append(item)
+
+    chunks = []
+    for items in groups.values():
+        chunk, chunk_chars = [], 0
+        for item in items:
+            path_chars = len(str(item[1][0].absolute())) + 3
+            if chunk and (len(chunk) >= _TEXCONV_MAX_FILES_PER_CALL
+                          or chunk_chars + path_chars > _TEXCONV_MAX_CMDLINE_CHARS):
+                chunks.append(chunk)
+                chunk, chunk_chars = [], 0
+            chunk.append(item)
+            chunk_chars += path_chars
+        chunks.append(chunk)
+    return chunks
+
+
+def _texconv_output_mtime(job: tuple, written_after_ns: int) -> Optional[int]:
+    """
+    mtime_ns of texconv's output for job if it looks complete, else None.
+
+    Complete means written during the call, with the planned dimensions and at
+    least the header plus the top mip level.
+    """
+    dds_file, output_file, _, _, plan = job
+    generated_dds = output_file.parent / dds_file.name
+    try:
+        st = generated_dds.stat()
+        if st.st_mtime_ns < written_after_ns:
+            return None
+        dims, _ = parse_dds_header(generated_dds)
+    except Exception:
+        return None
+
+    w, h = plan.new_width, plan.new_height
+    bpp = _BPP_MAP.get(plan.target_format, 32)
+    if plan.target_format in _COMPRESSED_FORMATS:
+        top_mip_bytes = ((w + 3) // 4) * ((h + 3) // 4) * bpp * 2
+    else:
+        top_mip_bytes = (w * h * bpp) // 8
+    if dims is None or tuple(dims) != (w, h) or st.st_size < 128 + top_mip_bytes:
+        return None
+    return st.st_mtime_ns
+
+
+def _discard_texconv_output(input_dds: Path, output_dds: Path):
+    """Remove a partial texconv output (named after the input) if there is one"""
+    try:
+        os.remove(output_dds.parent / input_dds.name)
+    except OSError:
+        pass
+
+
+def _run_texconv_group(chunk: List[tuple], settings: dict):
+    """
+    Convert several jobs with identical options in a single texconv call.
+
+    Saves a process launch per file. If the shared call fails or times out,
+    files whose output is missing or incomplete are re-run on their own, so
+    the error ends up on the file that caused it; finished files are kept.
+    """
+    dds_file, output_file, orig_dims, _, plan = chunk[0][1]
+
+    cmd = [TEXCONV_EXE] + _texconv_options(settings, plan, orig_dims, in_pool=True)
+    cmd.extend(["-o", str(output_file.parent.absolute()), "-y"])
+    cmd.extend(str(job[0].absolute()) for _, job in chunk)
+
+    started_ns = time.time_ns()
+    timed_out = False
+    try:
+        returncode = _run_texconv_quiet(cmd, timeout=_TEXCONV_TIMEOUT_PER_FILE * len(chunk))
+    except subprocess.TimeoutExpired:
+        returncode, timed_out = -1, True
+    except Exception:
+        returncode = -1
+
+    finished = set(range(len(chunk)))
+    if returncode != 0:
+        mtimes = {i: _texconv_output_mtime(job, started_ns - _MTIME_SLACK_NS)
+                  for i, (_, job) in enumerate(chunk)}
+        finished = {i for i, mtime in mtimes.items() if mtime is not None}
+        if timed_out and finished:
+            # texconv was killed, possibly while writing its newest output
+            finished.discard(max(finished, key=lambda i: mtimes[i]))
+
+    for i, (result, job) in enumerate(chunk):
+        if i not in finished:
+            _discard_texconv_output(job[0], job[1])
+            _run_file_job(result, job, settings, in_pool=True)
+            continue
+        try:
+            output_info = _finish_output(job[0], job[1], job[4])
+            result.success = True
+            result.output_size = output_info['output_size']
+            result.new_dims = (output_info['new_w'], output_info['new_h'])
+            result.new_format = output_info['new_format']
+        except Exception as e:
+            result.error_msg = str(e)
+
+
+def _process_batch_worker(tasks):
+    """
+    Process a batch of _process_file_worker tasks in one worker call.
+
+    Sending several files per submit amortizes the pickling/IPC round trip, and
+    files needing identical texconv options share one texconv call.
+    A failure on one file is recorded in its result and doesn't affect the rest.
+    """
+    results = []
+    pending = []
+    for task in tasks:
+        try:
+            result, job = _prepare_file_task(task)
+        except Exception as e:
+            result, job = ProcessingResult(
+                success=False,
+                relative_path=task[1],
+                input_size=0,
+                error_msg=str(e)
+            ), None
+        results.append(result)
+        if job is not None:
+            pending.append((result, job))
+
+    if not pending:
+        return results
+
+    settings = tasks[0][4]
+
+    # Passthrough copies don't involve texconv
+    conversions = []
+    for result, job in pending:
+        if job[4].is_passthrough:
+            _run_file_job(result, job, settings, in_pool=True)
+        else:
+            conversions.append((result, job))
+
+    for chunk in _group_texconv_jobs(conversions, settings):
+        if len(chunk) == 1:
+            _run_file_job(chunk[0][0], chunk[0][1], settings, in_pool=True)
+        else:
+            _run_texconv_group(chunk, settings)
+
+    return results
 
 
 def _analyze_file_worker(args):
-    """Worker function for parallel analysis. Must be at module level for pickling."""
-    dds_file_path, source_dir_path, settings = args
+    """
+    Worker function for analysis, run inline or on a thread pool.
+
+    Analysis never crosses a process boundary, so it takes the Path objects
+    from discovery as-is instead of strings.
+    """
+    dds_file, relative_path, settings, file_stat = args
 
-    dds_file = Path(dds_file_path)
-    source_dir = Path(source_dir_path)
-    relative_path = dds_file.relative_to(source_dir)
-    file_size = dds_file.stat().st_size
     is_nh = dds_file.stem.lower().endswith('_nh')
 
     result = AnalysisResult(
-        relative_path=str(relative_path),
-        file_size=file_size,
+        relative_path=relative_path,
+        file_size=file_stat[0],
         is_nh=is_nh
     )
 
     try:
         # Get dimensions and format using shared parser
-        dimensions, format_name = _get_dds_info(dds_file)
+        dimensions, format_name = _get_dds_info(dds_file, file_stat)
 
         if not dimensions:
             result.error = "Could not determine dimensions"
@@ -412,92 +939,28 @@ def _analyze_file_worker(args):
         # Check if this is an atlas
         is_atlas = is_texture_atlas(dds_file)
 
-        new_width, new_height = calculate_new_dimensions(width, height, settings, is_atlas=is_atlas)
-        result.new_width = new_width
-        result.new_height = new_height
-
+        plan = _resolve_output(width, height, current_format, is_nh, settings, is_atlas)
+        new_width, new_height = plan.new_width, plan.new_height
+        target_format = plan.target_format
+        should_preserve = plan.should_preserve
         will_resize = (new_width != width) or (new_height != height)
 
-        # Determine target format with smart format handling
-        target_format = settings['nh_format'] if is_nh else settings['n_format']
-
-        # Auto-fix: NH-labeled textures with no-alpha formats should be treated as N
-        if is_nh and settings.get('auto_fix_nh_to_n', True):
-            if current_format in ['BGR', 'BC5/ATI2', 'BC1/DXT1']:
-                target_format = settings['n_format']
-                is_nh = False
-
-        # Preserve compressed format when not resizing
-        should_preserve = False
-        if settings.get('preserve_compressed_format', True) and not will_resize:
-            compressed_formats = ['BC5/ATI2', 'BC3/DXT5', 'BC1/DXT1']
-            if current_format in compressed_formats:
-                if is_nh:
-                    if current_format == 'BC3/DXT5':
-                        should_preserve = True
-                else:
-                    if current_format in ['BC5/ATI2', 'BC1/DXT1']:
-                        should_preserve = True
-
-                if should_preserve:
-                    target_format = current_format
-
-        # Auto-optimize: N textures with alpha formats
-        if not is_nh and settings.get('auto_optimize_n_alpha', True) and not should_preserve:
-            if current_format == 'BGRA':
-                target_format = settings['n_format']
-            elif current_format == 'BC3/DXT5':
-                target_format = 'BC1/DXT1'
-
-        # Small texture override (only for uncompressed sources)
-        if settings.get('use_small_texture_override', True):
-            is_already_compressed = current_format in ['BC5/ATI2', 'BC3/DXT5', 'BC1/DXT1']
-
-            if not is_already_compressed:
-                min_dim_output = min(new_width, new_height)
-                if is_nh:
-                    threshold = settings.get('small_nh_threshold', 256)
-                    if threshold > 0 and min_dim_output <= threshold:
-                        target_format = "BGRA"
-                else:
-                    threshold = settings.get('small_n_threshold', 128)
-                    if threshold > 0 and min_dim_output <= threshold:
-                        target_format = "BGR"
-
+        result.new_width = new_width
+        result.new_height = new_height
         result.target_format = target_format
+        result.is_passthrough = plan.is_passthrough
 
         # Detect warnings
         warnings = []
-        original_is_nh = dds_file.stem.lower().endswith('_nh')
+        original_is_nh = is_nh
+        is_nh = plan.is_nh
 
         # Compressed passthrough info
-        if settings.get('allow_compressed_passthrough', False) and not will_resize:
-            if current_format in ['BC5/ATI2', 'BC3/DXT5', 'BC1/DXT1']:
-                can_passthrough = False
-                needs_rename = False
-
-                if original_is_nh and settings.get('auto_fix_nh_to_n', True):
-                    if current_format in ['BC5/ATI2', 'BC1/DXT1']:
-                        can_passthrough = True
-                        needs_rename = True
-                    elif current_format == 'BC3/DXT5':
-                        can_passthrough = True
-                        needs_rename = False
-                else:
-                    if not original_is_nh and settings.get('auto_optimize_n_alpha', True):
-                        if current_format == 'BC3/DXT5':
-                            can_passthrough = False
-                        else:
-                            can_passthrough = True
-                    else:
-                        can_passthrough = True
-
-                if can_passthrough:
-                    result.is_passthrough = True
-                    if needs_rename:
-                        warnings.append("Compressed passthrough (rename _NH→_N) - already optimized, no reprocessing needed")
-                    else:
-                        warnings.append("Compressed passthrough - already optimized, no reprocessing needed")
+        if plan.is_passthrough:
+            if plan.needs_rename:
+                warnings.append("Compressed passthrough (rename _NH→_N) - already optimized, no reprocessing needed")
+            else:
+                warnings.append("Compressed passthrough - already optimized, no reprocessing needed")
 
         # Auto-fixed mislabeled NH texture
         if original_is_nh and not is_nh and settings.get('auto_fix_nh_to_n', True):
@@ -523,13 +986,12 @@ def _analyze_file_worker(args):
 
         # NH texture saved to format without alpha channel
         if original_is_nh and is_nh:
-            if target_format in ["BGR", "BC5/ATI2", "BC1/DXT1"]:
+            if target_format in _NO_ALPHA_FORMATS:
                 warnings.append(f"NH texture will be saved as {target_format} - alpha channel not available")
 
         # Converting compressed to larger format warning
         if not settings.get('preserve_compressed_format', True):
-            compressed_source_formats = ["BC3/DXT5", "BC1/DXT1", "BC5/ATI2"]
-            if current_format in compressed_source_formats:
+            if current_format in _COMPRESSED_FORMATS:
                 size_increase_targets = []
                 if current_format == "BC1/DXT1":
                     if target_format in ["BC3/DXT5", "BC5/ATI2", "BGR", "BGRA"]:
@@ -545,17 +1007,7 @@ def _analyze_file_worker(args):
         result.warnings = warnings
 
         # Estimate output size
-        num_pixels = new_width * new_height * 1.33
-        bpp_map = {
-            "BC5/ATI2": 8,
-            "BC3/DXT5": 8,
-            "BC1/DXT1": 4,
-            "BGRA": 32,
-            "BGR": 24
-        }
-        bpp = bpp_map.get(target_format, 32)
-        total_bytes = int((num_pixels * bpp) / 8)
-        result.projected_size = total_bytes + 128
+        result.projected_size = _estimate_output_size(new_width, new_height, target_format)
 
     except Exception as e:
         result.error = str(e)
@@ -567,14 +1019,80 @@ def _analyze_file_worker(args):
 # Main Processor Class
 # =============================================================================
 
+def _warm_up_worker():
+    """No-op task; running it makes a worker process start and import this module"""
+    return None
+
+
+def warm_up_executor(executor: ProcessPoolExecutor, n_workers: int):
+    """
+    Start an executor's worker processes ahead of the first real task.
+
+    On Windows each worker is a fresh interpreter that has to import this
+    package, which takes a noticeable moment per worker. Submitting one no-op
+    per worker gets that done in the background. Does not wait.
+    """
+    for _ in range(n_workers):
+        executor.submit(_warm_up_worker)
+
+
+def _scan_normal_maps(root: Path) -> List[Tuple[Path, int, int, bool]]:
+    """
+    Recursively list _n.dds/_nh.dds files (any case) as (path, size, mtime_ns, is_nh).
+
+    Uses one os.scandir walk so sizes come from the directory entries
+    (free on Windows, where listing returns them) instead of a stat per file
+    in every worker. Names are classified from the lowercased entry name, so
+    the other DDS files in a mod never get a Path or a stat.
+    """
+    found = []
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        # Don't follow directory links, like rglob (a link cycle would never end)
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(Path(entry.path))
+                            continue
+                        name = entry.name.lower()
+                        if name.endswith('_nh.dds'):
+                            is_nh = True
+                        elif name.endswith('_n.dds'):
+                            is_nh = False
+                        else:
+                            continue
+                        if entry.is_file():
+                            st = entry.stat()
+                            found.append((Path(entry.path), st.st_size, st.st_mtime_ns, is_nh))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return found
+
+
 class NormalMapProcessor:
     """Core processor for normal map optimization"""
 
-    def __init__(self, settings: NormalSettings):
+    def __init__(self, settings: NormalSettings, executor: Optional[ProcessPoolExecutor] = None):
         self.settings = settings
         self.analysis_cache: Dict[str, AnalysisResult] = {}
         self._settings_hash = None
 
+        # (size, mtime_ns) per file path, filled by find_normal_maps
+        self.file_stats: Dict[Path, Tuple[int, int]] = {}
+        # Path relative to the input dir as a string (the cache/manifest key) per
+        # included file, filled by find_normal_maps
+        self.rel_paths: Dict[Path, str] = {}
+
+        # Worker pool shared by analysis and processing. A caller-provided pool
+        # (e.g. kept by the GUI across dry runs) is used as-is and not shut down here.
+        self._executor = executor
+        self._owns_executor = executor is None
+
         # Initialize file scanner with path filtering
         whitelist = settings.path_whitelist if hasattr(settings, 'path_whitelist') else ["Textures"]
         blacklist = settings.path_blacklist if hasattr(settings, 'path_blacklist') else ["icon", "icons", "bookart"]
@@ -588,6 +1106,26 @@ class NormalMapProcessor:
             path_blacklist=blacklist
         )
 
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Get the worker pool, starting it on first use"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.settings.max_workers)
+            self._owns_executor = True
+        return self._executor
+
+    def close(self):
+        """Shut down the worker pool if this processor started it"""
+        if self._executor is not None and self._owns_executor:
+            self._executor.shutdown(wait=True)
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
     def find_normal_maps(self, input_dir: Path, track_filtered: bool = False) -> Tuple[List[Path], List[Path]]:
         """
         Find all normal map files in directory. Returns (n_files, nh_files)
@@ -610,18 +1148,12 @@ class NormalMapProcessor:
                 'blacklist_files': [],
             }
 
-        is_case_sensitive = platform.system() != 'Windows'
-
-        if is_case_sensitive:
-            nh_candidates = list(input_dir.rglob("*_nh.dds")) + list(input_dir.rglob("*_NH.dds")) + \
-                           list(input_dir.rglob("*_Nh.dds")) + list(input_dir.rglob("*_nH.dds"))
-            n_candidates = list(input_dir.rglob("*_n.dds")) + list(input_dir.rglob("*_N.dds"))
-        else:
-            nh_candidates = list(input_dir.rglob("*_nh.dds"))
-            n_candidates = list(input_dir.rglob("*_n.dds"))
-
-        nh_files_raw = list(set(nh_candidates))
-        n_files_raw = [f for f in set(n_candidates) if not f.stem.lower().endswith('_nh')]
+        # Single walk that classifies while scanning and keeps the sizes it returned
+        n_files_raw, nh_files_raw = [], []
+        self.file_stats = {}
+        for f, size, mtime_ns, is_nh in _scan_normal_maps(input_dir):
+            (nh_files_raw if is_nh else n_files_raw).append(f)
+            self.file_stats[f] = (size, mtime_ns)
 
         if track_filtered:
             self.filter_stats['total_normal_maps_found'] = len(n_files_raw) + len(nh_files_raw)
@@ -659,6 +1191,10 @@ class NormalMapProcessor:
         n_files = [f for f in n_files_raw if filter_file(f)]
         nh_files = [f for f in nh_files_raw if filter_file(f)]
 
+        # Work out each relative path once; analysis, processing and the
+        # manifest all key on it
+        self.rel_paths = {f: str(f.relative_to(input_dir)) for f in n_files + nh_files}
+
         if track_filtered:
             self.filter_stats['included'] = len(n_files) + len(nh_files)
 
@@ -692,8 +1228,14 @@ class NormalMapProcessor:
         return results
 
     def process_files(self, input_dir: Path, output_dir: Path,
-                     progress_callback: Optional[Callable[[int, int, ProcessingResult], None]] = None) -> List[ProcessingResult]:
-        """Process all normal maps and return results. Requires analysis to be run first."""
+                     progress_callback: Optional[Callable[[int, int, ProcessingResult], None]] = None,
+                     files: Optional[Tuple[List[Path], List[Path]]] = None) -> List[ProcessingResult]:
+        """
+        Process all normal maps and return results. Requires analysis to be run first.
+
+        files: (n_files, nh_files) already returned by find_normal_maps() on this
+        processor, to avoid walking input_dir a second time.
+        """
         settings_dict = self.settings.to_dict()
         current_hash = hash(json.dumps(settings_dict, sort_keys=True))
 
@@ -703,32 +1245,60 @@ class NormalMapProcessor:
                 "or re-run it if settings have changed."
             )
 
-        n_files, nh_files = self.find_normal_maps(input_dir)
-
-        # Filter out passthrough files if copy_passthrough_files is disabled
-        copy_passthrough = settings_dict.get('copy_passthrough_files', False)
-        if not copy_passthrough:
-            def should_process(f):
-                rel_path = str(f.relative_to(input_dir))
-                cached = self._get_cached_analysis(rel_path)
-                if cached and cached.get('is_passthrough', False):
-                    return False  # Skip passthrough files
-                return True
+        if files is not None:
+            n_files, nh_files = files
+        else:
+            n_files, nh_files = self.find_normal_maps(input_dir)
 
-            n_files = [f for f in n_files if should_process(f)]
-            nh_files = [f for f in nh_files if should_process(f)]
+        n_files, nh_files = self.filter_passthrough(n_files, nh_files)
 
         total_files = len(n_files) + len(nh_files)
+        self.unchanged_skipped = 0
 
         if total_files == 0:
             return []
 
-        if self.settings.enable_parallel and total_files > 1:
+        # Skip files whose output from a previous run is still up to date
+        skip_unchanged = self.settings.skip_unchanged_files
+        manifest = {}
+        manifest_keys = {}
+        skipped_results = []
+        if skip_unchanged:
+            manifest = self._load_manifest(output_dir)
+            n_files, nh_files, skipped_results = self._skip_unchanged(
+                n_files, nh_files, input_dir, output_dir, settings_dict, manifest, manifest_keys)
+        else:
+            # Outputs are about to be rewritten without being tracked
+            self._remove_manifest(output_dir)
+        self.unchanged_skipped = len(skipped_results)
+
+        # Report skipped files first, then offset progress for the processed ones
+        inner_callback = progress_callback
+        if progress_callback and skipped_results:
+            for current, result in enumerate(skipped_results, 1):
+                progress_callback(current, total_files, result)
+            offset = len(skipped_results)
+
+            def offset_callback(current, total, result):
+                progress_callback(current + offset, total_files, result)
+            inner_callback = offset_callback
+
+        remaining = len(n_files) + len(nh_files)
+        if remaining:
+            self._create_output_dirs(output_dir, n_files, nh_files)
+
+        if remaining == 0:
+            results = []
+        elif self.settings.enable_parallel and remaining > 1:
             results = self._process_files_parallel(n_files, nh_files, input_dir, output_dir,
-                                                   settings_dict, progress_callback)
+                                                   settings_dict, inner_callback)
         else:
             results = self._process_files_sequential(n_files, nh_files, input_dir, output_dir,
-                                                     settings_dict, progress_callback)
+                                                     settings_dict, inner_callback)
+
+        if skip_unchanged:
+            self._save_manifest(output_dir, manifest, results, input_dir, settings_dict, manifest_keys)
+        results = skipped_results + results
 
         # Store post-processing stats for GUI to display
         # Count BGRX→BGR24 conversions (files with new_format containing BGR but not BGRA)
@@ -739,12 +1309,38 @@ class NormalMapProcessor:
 
         return results
 
+    def filter_passthrough(self, n_files: List[Path], nh_files: List[Path]) -> Tuple[List[Path], List[Path]]:
+        """
+        Drop files analysis found to need no changes, unless copy_passthrough_files
+        is set. Files must come from find_normal_maps() on this processor.
+        """
+        if self.settings.copy_passthrough_files:
+            return n_files, nh_files
+
+        def should_process(f):
+            cached = self._get_cached_analysis(self.rel_paths[f])
+            if cached and cached.get('is_passthrough', False):
+                return False  # Skip passthrough files
+            return True
+
+        return ([f for f in n_files if should_process(f)],
+                [f for f in nh_files if should_process(f)])
+
+    def _create_output_dirs(self, output_dir: Path, n_files: List[Path], nh_files: List[Path]):
+        """Create each output subdirectory once, so workers don't mkdir per file"""
+        rel_paths = self.rel_paths
+        subdirs = {os.path.dirname(rel_paths[f]) for f in n_files}
+        subdirs.update(os.path.dirname(rel_paths[f]) for f in nh_files)
+        output_dir_str = str(output_dir)
+        for subdir in subdirs:
+            os.makedirs(os.path.join(output_dir_str, subdir), exist_ok=True)
+
     def _analyze_files_sequential(self, all_files: List[Path], source_dir: Path,
                                   settings: dict, progress_callback: Optional[Callable] = None) -> List[AnalysisResult]:
         """Analyze files sequentially"""
         results = []
         for i, f in enumerate(all_files, 1):
-            result = _analyze_file_worker((str(f), str(source_dir), settings))
+            result = _analyze_file_worker((f, self.rel_paths[f], settings, self.file_stats[f]))
             results.append(result)
             if progress_callback:
                 progress_callback(i, len(all_files))
@@ -752,43 +1348,25 @@ class NormalMapProcessor:
 
     def _analyze_files_parallel(self, all_files: List[Path], source_dir: Path,
                                 settings: dict, progress_callback: Optional[Callable] = None) -> List[AnalysisResult]:
-        """Analyze files in parallel for better I/O throughput on slow storage"""
+        """
+        Analyze files on a thread pool for better I/O throughput on slow storage.
+
+        Analysis only reads 128-byte headers (or waits on texdiag), which releases
+        the GIL, so threads overlap the I/O without the process pool's pickling
+        and IPC. Header info read here also lands in this process's cache.
+        """
         results = []
-        completed = 0
         total_files = len(all_files)
-        chunk_size = 100  # Process in chunks for better progress feedback
-
-        with ProcessPoolExecutor(max_workers=self.settings.max_workers) as executor:
-            # Process in chunks
-            for chunk_start in range(0, total_files, chunk_size):
-                chunk_end = min(chunk_start + chunk_size, total_files)
-                chunk = all_files[chunk_start:chunk_end]
-
-                # Submit chunk
-                futures = {}
-                for f in chunk:
-                    args = (str(f), str(source_dir), settings)
-                    future = executor.submit(_analyze_file_worker, args)
-                    futures[future] = f
-
-                # Collect results from this chunk
-                for future in as_completed(futures):
-                    completed += 1
-                    try:
-                        result = future.result()
-                        results.append(result)
-                    except Exception as e:
-                        # Create error result for failed analysis
-                        file_path = futures[future]
-                        error_result = AnalysisResult(
-                            relative_path=str(file_path.relative_to(source_dir)),
-                            file_size=file_path.stat().st_size if file_path.exists() else 0,
-                            error=str(e)
-                        )
-                        results.append(error_result)
-
-                    if progress_callback:
-                        progress_callback(completed, total_files)
+
+        file_stats, rel_paths = self.file_stats, self.rel_paths
+        args_iter = ((f, rel_paths[f], settings, file_stats[f]) for f in all_files)
+
+        # Oversubscribe: the threads mostly wait on disk
+        with ThreadPoolExecutor(max_workers=self.settings.max_workers * 2) as pool:
+            for completed, result in enumerate(pool.map(_analyze_file_worker, args_iter), 1):
+                results.append(result)
+                if progress_callback:
+                    progress_callback(completed, total_files)
 
         return results
 
@@ -796,44 +1374,46 @@ class NormalMapProcessor:
                                 source_dir: Path, output_dir: Path, settings: dict,
                                 progress_callback: Optional[Callable] = None) -> List[ProcessingResult]:
         """Process files in parallel"""
+        jobs = [(f, False) for f in n_files] + [(f, True) for f in nh_files]
+
         all_tasks = []
-        for f in n_files:
-            rel_path = str(f.relative_to(source_dir))
+        costs = []
+        for f, is_nh in jobs:
+            rel_path = self.rel_paths[f]
             cached = self._get_cached_analysis(rel_path)
-            all_tasks.append((str(f), str(source_dir), str(output_dir), False, settings, cached))
-        for f in nh_files:
-            rel_path = str(f.relative_to(source_dir))
-            cached = self._get_cached_analysis(rel_path)
-            all_tasks.append((str(f), str(source_dir), str(output_dir), True, settings, cached))
+            file_stat = self.file_stats[f]
+            all_tasks.append((str(f), rel_path, str(output_dir), is_nh, settings, cached, file_stat))
+            costs.append(_task_cost(cached, file_stat))
 
         results = []
         current = 0
         total = len(all_tasks)
 
-        with ProcessPoolExecutor(max_workers=self.settings.max_workers) as executor:
-            future_to_file = {}
-            for task in all_tasks:
-                future = executor.submit(_process_file_worker, task)
-                future_to_file[future] = task[0]
+        batches = _create_file_batches(all_tasks, costs, self.settings.max_workers,
+                                       self.settings.batches_per_worker)
 
-            for future in as_completed(future_to_file):
-                current += 1
-                try:
-                    result = future.result()
-                    results.append(result)
-                    if progress_callback:
-                        progress_callback(current, total, result)
-                except Exception as e:
-                    file_path = future_to_file[future]
-                    error_result = ProcessingResult(
+        executor = self._get_executor()
+        future_to_batch = {executor.submit(_process_batch_worker, batch): batch for batch in batches}
+
+        for future in as_completed(future_to_batch):
+            try:
+                batch_results = future.result()
+            except Exception as e:
+                batch_results = [
+                    ProcessingResult(
                         success=False,
-                        relative_path=str(Path(file_path).name),
+                        relative_path=task[1],
                         input_size=0,
                         error_msg=str(e)
                     )
-                    results.append(error_result)
-                    if progress_callback:
-                        progress_callback(current, total, error_result)
+                    for task in future_to_batch[future]
+                ]
+
+            for result in batch_results:
+                current += 1
+                results.append(result)
+                if progress_callback:
+                    progress_callback(current, total, result)
 
         return results
 
@@ -842,30 +1422,165 @@ class NormalMapProcessor:
                                   progress_callback: Optional[Callable] = None) -> List[ProcessingResult]:
         """Process files sequentially"""
         results = []
-        current = 0
-        total = len(n_files) + len(nh_files)
+        jobs = [(f, False) for f in n_files] + [(f, True) for f in nh_files]
+        total = len(jobs)
 
-        for f in n_files:
-            current += 1
-            rel_path = str(f.relative_to(source_dir))
+        for current, (f, is_nh) in enumerate(jobs, 1):
+            rel_path = self.rel_paths[f]
             cached = self._get_cached_analysis(rel_path)
-            args = (str(f), str(source_dir), str(output_dir), False, settings, cached)
+            args = (str(f), rel_path, str(output_dir), is_nh, settings, cached, self.file_stats[f])
             result = _process_file_worker(args)
             results.append(result)
             if progress_callback:
                 progress_callback(current, total, result)
 
-        for f in nh_files:
-            current += 1
-            rel_path = str(f.relative_to(source_dir))
+        return results
+
+    def _manifest_key(self, f: Path, rel_path: str, settings: dict) -> Optional[str]:
+        """Identity of a file's output: input size/mtime, resolved plan, output path and encode settings"""
+        cached = self._get_cached_analysis(rel_path)
+        file_stat = self.file_stats.get(f)
+        if not cached or not file_stat or cached['width'] is None:
+            return None
+        return json.dumps([
+            file_stat[0], file_stat[1],
+            cached['new_width'], cached['new_height'], cached['target_format'], cached['is_passthrough'],
+            _output_rel_path(rel_path, cached, settings),
+            [settings.get(k) for k in _ENCODE_SETTING_KEYS],
+        ])
+
+    def _load_manifest(self, output_dir: Path) -> dict:
+        """
+        Load the output manifest from a previous run (empty if missing or unreadable).
+
+        The file may have been edited by hand, so malformed entries and entries
+        pointing outside output_dir are dropped.
+        """
+        try:
+            with open(output_dir / _MANIFEST_NAME, 'r', encoding='utf-8') as fh:
+                manifest = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(manifest, dict):
+            return {}
+        return {rel_path: entry for rel_path, entry in manifest.items()
+                if _valid_manifest_entry(entry) and _is_within(output_dir / entry['output'], output_dir)}
+
+    def _remove_manifest(self, output_dir: Path):
+        """Drop a manifest left by an earlier run, which would no longer match the outputs"""
+        try:
+            os.remove(output_dir / _MANIFEST_NAME)
+        except OSError:
+            pass
+
+    def _skip_unchanged(self, n_files: List[Path], nh_files: List[Path], input_dir: Path,
+                        output_dir: Path, settings: dict, manifest: dict,
+                        manifest_keys: Dict[str, str]):
+        """
+        Split off files whose manifest entry still matches and whose output is intact.
+
+        Returns (n_files, nh_files, skipped_results). manifest_keys is filled with
+        the key of every file considered, for _save_manifest.
+        """
+        skipped_results = []
+
+        def still_needed(f: Path) -> bool:
+            rel_path = self.rel_paths[f]
+            key = self._manifest_key(f, rel_path, settings)
+            if key is None:
+                return True
+            manifest_keys[rel_path] = key
+
+            entry = manifest.get(rel_path)
+            if not entry or entry.get('key') != key:
+                return True
+            try:
+                st = (output_dir / entry['output']).stat()
+                if st.st_size != entry['output_size'] or st.st_mtime_ns != entry['output_mtime_ns']:
+                    return True
+            except (OSError, KeyError, TypeError):
+                return True
+
             cached = self._get_cached_analysis(rel_path)
-            args = (str(f), str(source_dir), str(output_dir), True, settings, cached)
-            result = _process_file_worker(args)
-            results.append(result)
-            if progress_callback:
-                progress_callback(current, total, result)
+            skipped_results.append(ProcessingResult(
+                success=True,
+                relative_path=rel_path,
+                input_size=self.file_stats[f][0],
+                output_size=entry['output_size'],
+                orig_dims=(cached['width'], cached['height']),
+                new_dims=tuple(entry['new_dims']),
+                orig_format=cached['format'],
+                new_format=entry['new_format'],
+            ))
+            return False
 
-        return results
+        n_files = [f for f in n_files if still_needed(f)]
+        nh_files = [f for f in nh_files if still_needed(f)]
+        return n_files, nh_files, skipped_results
+
+    def _save_manifest(self, output_dir: Path, manifest: dict, results: List[ProcessingResult],
+                       input_dir: Path, settings: dict, manifest_keys: Dict[str, str]):
+        """Record the files written by this run in the output manifest"""
+        changed = False
+
+        # Forget inputs that are gone (their old outputs are left alone)
+        discovered = set(self.rel_paths.values())
+        for rel_path in [r for r in manifest if r not in discovered]:
+            del manifest[rel_path]
+            changed = True
+
+        for result in results:
+            rel_path = result.relative_path
+            if not result.success or result.output_size <= 0:
+                changed |= manifest.pop(rel_path, None) is not None
+                continue
+
+            key = manifest_keys.get(rel_path)
+            if key is None:
+                key = self._manifest_key(input_dir / rel_path, rel_path, settings)
+                if key is None:
+                    continue
+
+            output_rel = _output_rel_path(rel_path, self._get_cached_analysis(rel_path), settings)
+            try:
+                st = (output_dir / output_rel).stat()
+            except OSError:
+                changed |= manifest.pop(rel_path, None) is not None
+                continue
+
+            # An earlier run wrote this file under another name (e.g. before _nh -> _n auto-fix)
+            previous = manifest.get(rel_path)
+            if previous is not None and previous['output'] != output_rel:
+                previous_output = output_dir / previous['output']
+                # Never delete anything outside the output folder
+                if _is_within(previous_output, output_dir):
+                    try:
+                        os.remove(previous_output)
+                    except OSError:
+                        pass
+
+            manifest[rel_path] = {
+                'key': key,
+                'output': output_rel,
+                'output_size': st.st_size,
+                'output_mtime_ns': st.st_mtime_ns,
+                'new_dims': list(result.new_dims),
+                'new_format': result.new_format,
+            }
+            changed = True
+
+        if not changed:
+            return
+
+        manifest_path = output_dir / _MANIFEST_NAME
+        tmp_path = manifest_path.with_suffix('.tmp')
+        try:
+            output_dir.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as fh:
+                json.dump(manifest, fh)
+            os.replace(tmp_path, manifest_path)
+        except OSError:
+            pass  # Manifest is only an optimization for the next run
 
     def _get_cached_analysis(self, relative_path: str) -> Optional[dict]:
         """Get cached analysis data for a file"""
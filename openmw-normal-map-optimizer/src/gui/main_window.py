@@ -9,8 +9,11 @@ import threading
 import webbrowser
 import time
 import json
+import queue
+from collections import defaultdict, deque
 from pathlib import Path
 from multiprocessing import cpu_count
+from concurrent.futures import ProcessPoolExecutor
 
 from src.core import (
     NormalMapProcessor,
@@ -20,7 +23,8 @@ from src.core import (
     format_size,
     format_time,
     get_parser_stats,
-    reset_parser_stats
+    reset_parser_stats,
+    warm_up_executor
 )
 from src.core.normal_settings import DEFAULT_BLACKLIST, AGGRESSIVE_BLACKLIST
 
@@ -31,19 +35,27 @@ class NormalMapProcessorGUI:
     WINDOW_WIDTH = 850
     WINDOW_HEIGHT = 1200
     WRAPLENGTH = 700
+    UI_POLL_MS = 50
 
     def __init__(self, root):
         self.root = root
         self.root.title("Normal Map Processor")
         self.root.geometry(f"{self.WINDOW_WIDTH}x{self.WINDOW_HEIGHT}")
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # State
+        self._cpu_count = cpu_count()
         self.processing = False
         self.total_input_size = 0
         self.total_output_size = 0
         self.processed_count = 0
         self.failed_count = 0
         self.processor = None  # Store processor instance to maintain cache
+        self._executor = None  # Worker pool kept alive across dry runs and processing
+        self._executor_workers = 0
+        self._log_queue = deque()  # Lines waiting for the next log flush
+        self._progress_queue = queue.Queue()  # (maximum, value, text) updates from worker threads
+        self._ui_calls = queue.Queue()  # Widget calls from worker threads, run in order on the Tk thread
 
         # UI Variables
         self.input_dir = tk.StringVar()
@@ -62,13 +74,14 @@ class NormalMapProcessorGUI:
         self.small_nh_threshold = tk.IntVar(value=256)
         self.small_n_threshold = tk.IntVar(value=128)
         self.enable_parallel = tk.BooleanVar(value=True)
-        self.max_workers = tk.IntVar(value=max(1, cpu_count() - 1))
-        self.chunk_size_mb = tk.IntVar(value=75)
+        self.max_workers = tk.IntVar(value=max(1, self._cpu_count - 1))
+        self.batches_per_worker = tk.IntVar(value=4)
         self.preserve_compressed_format = tk.BooleanVar(value=True)
         self.auto_fix_nh_to_n = tk.BooleanVar(value=True)
         self.auto_optimize_n_alpha = tk.BooleanVar(value=True)
         self.allow_compressed_passthrough = tk.BooleanVar(value=False)
         self.copy_passthrough_files = tk.BooleanVar(value=False)
+        self.skip_unchanged_files = tk.BooleanVar(value=False)
 
         # Atlas settings
         self.enable_atlas_downscaling = tk.BooleanVar(value=False)
@@ -94,11 +107,16 @@ class NormalMapProcessorGUI:
                     self.uniform_weighting, self.use_dithering, self.use_small_texture_override,
                     self.small_nh_threshold, self.small_n_threshold, self.preserve_compressed_format,
                     self.auto_fix_nh_to_n, self.auto_optimize_n_alpha, self.allow_compressed_passthrough,
-                    self.copy_passthrough_files, self.enable_atlas_downscaling, self.atlas_max_resolution,
+                    self.copy_passthrough_files, self.skip_unchanged_files, self.enable_atlas_downscaling, self.atlas_max_resolution,
                     self.enforce_power_of_2, self.use_path_whitelist, self.use_path_blacklist,
                     self.use_aggressive_blacklist, self.custom_blacklist]:
             var.trace_add('write', self.invalidate_analysis_cache)
 
+        self.root.after(self.UI_POLL_MS, self._poll_ui)
+
+        # Start worker processes while the user is still picking folders
+        self.root.after_idle(self._warm_up_executor)
+
     def create_widgets(self):
         notebook = ttk.Notebook(self.root)
         notebook.pack(fill="both", expand=True, padx=10, pady=10)
@@ -468,14 +486,14 @@ class NormalMapProcessorGUI:
 
         ttk.Label(frame_formats, text="_N.dds format:").grid(row=0, column=0, sticky="w", pady=5)
         n_combo = ttk.Combobox(frame_formats, textvariable=self.n_format,
-                               values=["BC5/ATI2", "BC1/DXT1", "BGRA", "BGR"], state="readonly", width=20)
+                               values=("BC5/ATI2", "BC1/DXT1", "BGRA", "BGR"), state="readonly", width=20)
         n_combo.grid(row=0, column=1, sticky="w", padx=10, pady=5)
         ttk.Label(frame_formats, text="(Recommended: BC5/ATI2 - RG only)",
                  font=("", 8, "italic")).grid(row=0, column=2, sticky="w")
 
         ttk.Label(frame_formats, text="_NH.dds format (RGBA):").grid(row=2, column=0, sticky="w", pady=5)
         nh_combo = ttk.Combobox(frame_formats, textvariable=self.nh_format,
-                                values=["BC3/DXT5", "BGRA"], state="readonly", width=20)
+                                values=("BC3/DXT5", "BGRA"), state="readonly", width=20)
         nh_combo.grid(row=2, column=1, sticky="w", padx=10, pady=5)
         ttk.Label(frame_formats, text="(Recommended: BC3/DXT5 (mostly) Read the Documentation Section.)",
                  font=("", 8, "italic")).grid(row=2, column=2, sticky="w")
@@ -500,24 +518,24 @@ class NormalMapProcessorGUI:
 
         ttk.Label(frame_resize, text="Downscale Method:").grid(row=2, column=0, sticky="w", pady=5)
         resize_combo = ttk.Combobox(frame_resize, textvariable=self.resize_method,
-                                    values=[
+                                    values=(
                                         "CUBIC (Recommended - smooth surfaces + detail)",
                                         "FANT (Detail preservation - similar to Lanczos)",
                                         "BOX (Blurry, good for gradients)",
                                         "LINEAR (Fast, general purpose)"
-                                    ], state="readonly", width=45)
+                                    ), state="readonly", width=45)
         resize_combo.grid(row=2, column=1, sticky="w", padx=10, pady=5)
 
         ttk.Label(frame_resize, text="Downscale Factor:").grid(row=3, column=0, sticky="w", pady=5)
         scale_combo = ttk.Combobox(frame_resize, textvariable=self.scale_factor,
-                                   values=[0.125, 0.25, 0.5, 1.0], state="readonly", width=20)
+                                   values=(0.125, 0.25, 0.5, 1.0), state="readonly", width=20)
         scale_combo.grid(row=3, column=1, sticky="w", padx=10, pady=5)
         ttk.Label(frame_resize, text="(1.0 = no downscaling unless max resolution set)",
                  font=("", 8, "italic")).grid(row=3, column=2, sticky="w")
 
         ttk.Label(frame_resize, text="Max Resolution (Ceiling):").grid(row=4, column=0, sticky="w", pady=5)
         max_res_combo = ttk.Combobox(frame_resize, textvariable=self.max_resolution,
-                                     values=[0, 128, 256, 512, 1024, 2048, 4096, 8192],
+                                     values=(0, 128, 256, 512, 1024, 2048, 4096, 8192),
                                      state="readonly", width=20)
         max_res_combo.grid(row=4, column=1, sticky="w", padx=10, pady=5)
         ttk.Label(frame_resize, text="(0 = disabled)",
@@ -525,7 +543,7 @@ class NormalMapProcessorGUI:
 
         ttk.Label(frame_resize, text="Min Resolution (Floor):").grid(row=5, column=0, sticky="w", pady=5)
         min_res_combo = ttk.Combobox(frame_resize, textvariable=self.min_resolution,
-                                     values=[0, 128, 256, 512, 1024, 2048, 4096, 8192],
+                                     values=(0, 128, 256, 512, 1024, 2048, 4096, 8192),
                                      state="readonly", width=20)
         min_res_combo.grid(row=5, column=1, sticky="w", padx=10, pady=5)
         ttk.Label(frame_resize, text="(0 = disabled)",
@@ -665,14 +683,14 @@ class NormalMapProcessorGUI:
 
         ttk.Label(frame_small_tex, text="_NH threshold (BGRA):").grid(row=2, column=0, sticky="w", pady=5, padx=(20, 0))
         nh_threshold_combo = ttk.Combobox(frame_small_tex, textvariable=self.small_nh_threshold,
-                                         values=[0, 64, 128, 256, 512], state="readonly", width=15)
+                                         values=(0, 64, 128, 256, 512), state="readonly", width=15)
         nh_threshold_combo.grid(row=2, column=1, sticky="w", padx=10, pady=5)
         ttk.Label(frame_small_tex, text="(Textures ≤ this on any side use BGRA, recommended: 256)",
                  font=("", 8, "italic")).grid(row=2, column=2, sticky="w")
 
         ttk.Label(frame_small_tex, text="_N threshold (BGR):").grid(row=3, column=0, sticky="w", pady=5, padx=(20, 0))
         n_threshold_combo = ttk.Combobox(frame_small_tex, textvariable=self.small_n_threshold,
-                                        values=[0, 64, 128, 256, 512], state="readonly", width=15)
+                                        values=(0, 64, 128, 256, 512), state="readonly", width=15)
         n_threshold_combo.grid(row=3, column=1, sticky="w", padx=10, pady=5)
         ttk.Label(frame_small_tex, text="(Textures ≤ this on any side use BGR, recommended: 128)",
                  font=("", 8, "italic")).grid(row=3, column=2, sticky="w")
@@ -689,31 +707,43 @@ class NormalMapProcessorGUI:
                        variable=self.enable_parallel).grid(row=0, column=0, columnspan=3, sticky="w", pady=2)
 
         ttk.Label(frame_parallel,
-                 text=f"Parallel processing uses multiple CPU cores to process files simultaneously. Detected: {cpu_count()} cores",
+                 text=f"Parallel processing uses multiple CPU cores to process files simultaneously. Detected: {self._cpu_count} cores",
                  font=("", 8), wraplength=600, justify="left").grid(row=1, column=0, columnspan=3, sticky="w", pady=2)
 
         ttk.Label(frame_parallel, text="Max workers:").grid(row=2, column=0, sticky="w", pady=5, padx=(20, 0))
         workers_combo = ttk.Combobox(frame_parallel, textvariable=self.max_workers,
-                                     values=list(range(1, cpu_count() + 1)), state="readonly", width=15)
+                                     values=tuple(range(1, self._cpu_count + 1)), state="readonly", width=15)
         workers_combo.grid(row=2, column=1, sticky="w", padx=10, pady=5)
-        ttk.Label(frame_parallel, text=f"(CPU cores to use, recommended: {max(1, cpu_count() - 1)})",
+        ttk.Label(frame_parallel, text=f"(CPU cores to use, recommended: {max(1, self._cpu_count - 1)})",
                  font=("", 8, "italic")).grid(row=2, column=2, sticky="w")
 
-        ttk.Label(frame_parallel, text="Chunk size (MB):").grid(row=3, column=0, sticky="w", pady=5, padx=(20, 0))
-        chunk_combo = ttk.Combobox(frame_parallel, textvariable=self.chunk_size_mb,
-                                   values=[25, 50, 75, 100, 150, 200], state="readonly", width=15)
-        chunk_combo.grid(row=3, column=1, sticky="w", padx=10, pady=5)
-        ttk.Label(frame_parallel, text="(Total filesize per batch, recommended: 50-100MB)",
+        ttk.Label(frame_parallel, text="Batches per worker:").grid(row=3, column=0, sticky="w", pady=5, padx=(20, 0))
+        batches_combo = ttk.Combobox(frame_parallel, textvariable=self.batches_per_worker,
+                                     values=(1, 2, 4, 8, 16), state="readonly", width=15)
+        batches_combo.grid(row=3, column=1, sticky="w", padx=10, pady=5)
+        ttk.Label(frame_parallel, text="(Work batches queued per worker, recommended: 4)",
                  font=("", 8, "italic")).grid(row=3, column=2, sticky="w")
 
         ttk.Label(frame_parallel,
-                 text="⚠ Chunking groups files by total size to balance I/O and CPU usage across workers.\n"
-                      "Larger chunks = fewer context switches, but less granular progress.\n"
-                      "Smaller chunks = more responsive progress, but more overhead.\n\n"
-                      "If your computer becomes unresponsive, lower the CPU cores used or make the chunks smaller.\n"
+                 text="⚠ Files are split into batches by count, largest files first, so no worker sits idle at the end.\n"
+                      "More batches = better load balancing and more granular progress.\n"
+                      "Fewer batches = less scheduling overhead.\n\n"
+                      "If your computer becomes unresponsive, lower the CPU cores used.\n"
                       "This is pretty unlikely though. It's worth making 15 minutes of processing take only 15 seconds.",
                  font=("", 8), wraplength=600, justify="left").grid(row=4, column=0, columnspan=3, sticky="w", pady=(5, 2))
 
+        # Incremental Processing
+        frame_incremental = ttk.LabelFrame(scrollable, text="Incremental Processing", padding=10)
+        frame_incremental.pack(fill="x", padx=10, pady=5)
+
+        ttk.Checkbutton(frame_incremental, text="Skip files unchanged since the last run",
+                       variable=self.skip_unchanged_files).grid(row=0, column=0, columnspan=3, sticky="w", pady=2)
+        ttk.Label(frame_incremental,
+                 text="Processing into the same output folder again only re-encodes files whose input or resulting settings changed,\n"
+                      "or whose output was deleted or modified. A small manifest file in the output folder tracks this\n"
+                      "(delete it before releasing the folder as a mod). When disabled, every file is re-encoded and no manifest is written.",
+                 font=("", 8), wraplength=600, justify="left").grid(row=1, column=0, columnspan=3, sticky="w", pady=2)
+
         # Power-of-2 Enforcement
         frame_pow2 = ttk.LabelFrame(scrollable, text="Power-of-2 Enforcement", padding=10)
         frame_pow2.pack(fill="x", padx=10, pady=5)
@@ -813,7 +843,7 @@ class NormalMapProcessorGUI:
 
         ttk.Label(frame_atlas, text="Max resolution for atlases:", font=("", 9)).grid(row=3, column=0, sticky="w", padx=(0, 10), pady=5)
         atlas_max_combo = ttk.Combobox(frame_atlas, textvariable=self.atlas_max_resolution,
-                                       values=[1024, 2048, 4096, 8192, 16384],
+                                       values=(1024, 2048, 4096, 8192, 16384),
                                        state="readonly", width=15)
         atlas_max_combo.grid(row=3, column=1, sticky="w", pady=5)
         ttk.Label(frame_atlas,
@@ -878,14 +908,80 @@ class NormalMapProcessorGUI:
             self.output_dir.set(directory)
 
     def log(self, message):
+        """Queue a log line. Safe to call from worker threads; shown on the next flush."""
+        self._log_queue.append(message)
+
+    def _flush_log(self):
+        """Write all queued log lines to the log widget in one insert"""
+        lines = []
+        while self._log_queue:
+            lines.append(self._log_queue.popleft())
+        if not lines:
+            return
         self.log_text.configure(state="normal")
-        self.log_text.insert("end", f"{message}\n")
+        self.log_text.insert("end", "\n".join(lines) + "\n")
         self.log_text.see("end")
         self.log_text.configure(state="disabled")
-        self.root.update_idletasks()
+
+    def _post_progress(self, value=None, maximum=None, text=None):
+        """Queue a progress bar/label update. Safe to call from worker threads."""
+        self._progress_queue.put((maximum, value, text))
+
+    def _on_ui(self, func, *args, **kwargs):
+        """Run a widget call on the Tk thread. Safe to call from worker threads."""
+        self._ui_calls.put((func, args, kwargs))
+
+    def _poll_ui(self):
+        """
+        Apply everything worker threads queued for the UI since the last poll.
+
+        This is the only place their log lines, widget calls and progress
+        reach Tk. Log lines go first so dialogs show up after the log text
+        they summarize. Only the latest progress update is applied.
+        """
+        try:
+            self._flush_log()
+
+            while True:
+                try:
+                    func, args, kwargs = self._ui_calls.get_nowait()
+                except queue.Empty:
+                    break
+                # One failing call must not stop the ones after it
+                try:
+                    func(*args, **kwargs)
+                except Exception as e:
+                    self.log(f"⚠ UI update failed: {e}")
+
+            maximum = value = text = None
+            while True:
+                try:
+                    new_maximum, new_value, new_text = self._progress_queue.get_nowait()
+                except queue.Empty:
+                    break
+                maximum = new_maximum if new_maximum is not None else maximum
+                value = new_value if new_value is not None else value
+                text = new_text if new_text is not None else text
+
+            if maximum is not None:
+                self.progress_bar["maximum"] = maximum
+            if value is not None:
+                self.progress_bar["value"] = value
+            if text is not None:
+                self.progress_label.config(text=text)
+        finally:
+            # Keep polling no matter what, or the UI stops updating for good
+            self.root.after(self.UI_POLL_MS, self._poll_ui)
+
+    def _clear_log(self):
+        self._log_queue.clear()
+        self.log_text.configure(state="normal")
+        self.log_text.delete("1.0", "end")
+        self.log_text.configure(state="disabled")
 
     def export_log(self):
         """Export current log content to a text file"""
+        self._flush_log()
         log_content = self.log_text.get("1.0", "end-1c")
         if not log_content.strip():
             messagebox.showwarning("Warning", "No log content to export")
@@ -930,6 +1026,29 @@ class NormalMapProcessorGUI:
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to export settings:\n{str(e)}")
 
+    def _get_executor(self, max_workers: int) -> ProcessPoolExecutor:
+        """Get the shared worker pool, (re)starting it if the worker count changed or it broke"""
+        if (self._executor is None or self._executor_workers != max_workers
+                or getattr(self._executor, '_broken', False)):
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = ProcessPoolExecutor(max_workers=max_workers)
+            self._executor_workers = max_workers
+        return self._executor
+
+    def _warm_up_executor(self):
+        """Start the worker pool in the background so the first run doesn't wait on it"""
+        if self.enable_parallel.get():
+            max_workers = self.max_workers.get()
+            warm_up_executor(self._get_executor(max_workers), max_workers)
+
+    def on_close(self):
+        """Shut down the worker pool and close the window"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self.root.destroy()
+
     def invalidate_analysis_cache(self, *args):
         """Invalidate analysis cache when settings change"""
         if self.processor:
@@ -961,12 +1080,13 @@ class NormalMapProcessorGUI:
             resize_method=self.resize_method.get(),
             enable_parallel=self.enable_parallel.get(),
             max_workers=self.max_workers.get(),
-            chunk_size_mb=self.chunk_size_mb.get(),
+            batches_per_worker=self.batches_per_worker.get(),
             preserve_compressed_format=self.preserve_compressed_format.get(),
             auto_fix_nh_to_n=self.auto_fix_nh_to_n.get(),
             auto_optimize_n_alpha=self.auto_optimize_n_alpha.get(),
             allow_compressed_passthrough=self.allow_compressed_passthrough.get(),
             copy_passthrough_files=self.copy_passthrough_files.get(),
+            skip_unchanged_files=self.skip_unchanged_files.get(),
             enable_atlas_downscaling=self.enable_atlas_downscaling.get(),
             atlas_max_resolution=self.atlas_max_resolution.get(),
             enforce_power_of_2=self.enforce_power_of_2.get(),
@@ -983,15 +1103,21 @@ class NormalMapProcessorGUI:
             messagebox.showerror("Error", "Please select input directory")
             return
 
+        # Snapshot the Tk variables here: the worker thread must not read them
+        try:
+            settings = self.get_settings()
+        except (tk.TclError, ValueError) as e:
+            messagebox.showerror("Error", f"Invalid settings:\n{e}")
+            return
+        input_dir = Path(self.input_dir.get())
+
         self.processing = True
         self.analyze_btn.configure(state="disabled")
         self.process_btn.configure(state="disabled")
         self.export_btn.configure(state="disabled")
-        self.log_text.configure(state="normal")
-        self.log_text.delete("1.0", "end")
-        self.log_text.configure(state="disabled")
+        self._clear_log()
 
-        threading.Thread(target=self.analyze_files, daemon=True).start()
+        threading.Thread(target=self.analyze_files, args=(settings, input_dir), daemon=True).start()
 
     def start_processing(self):
         if self.processing:
@@ -1004,9 +1130,7 @@ class NormalMapProcessorGUI:
         self.processing = True
         self.analyze_btn.configure(state="disabled")
         self.process_btn.configure(state="disabled")
-        self.log_text.configure(state="normal")
-        self.log_text.delete("1.0", "end")
-        self.log_text.configure(state="disabled")
+        self._clear_log()
 
         self.total_input_size = 0
         self.total_output_size = 0
@@ -1014,19 +1138,22 @@ class NormalMapProcessorGUI:
         self.failed_count = 0
         self.stats_label.config(text="Processing...")
 
-        threading.Thread(target=self.process_files, daemon=True).start()
+        # Snapshot the Tk variables here: the worker thread must not read them
+        input_dir = Path(self.input_dir.get())
+        output_dir = Path(self.output_dir.get())
+        threading.Thread(target=self.process_files, args=(input_dir, output_dir), daemon=True).start()
 
-    def analyze_files(self):
-        """Run analysis using core processor"""
+    def analyze_files(self, settings: ProcessingSettings, input_dir: Path):
+        """Run analysis using core processor (on a worker thread, with settings read by start_analysis)"""
         start_time = time.time()
         try:
             reset_parser_stats()  # Reset statistics at start of dry run
-            settings = self.get_settings()
 
             # Create new processor instance (invalidates old cache)
-            self.processor = NormalMapProcessor(settings)
+            # Only parallel runs need the worker pool
+            executor = self._get_executor(settings.max_workers) if settings.enable_parallel else None
+            self.processor = NormalMapProcessor(settings, executor=executor)
 
-            input_dir = Path(self.input_dir.get())
             self.log("=== Dry Run (Preview) ===\n")
 
             # Log analysis mode info
@@ -1077,18 +1204,19 @@ class NormalMapProcessorGUI:
                 self.log("  - .dds files ending in _n or _nh")
                 self.log("  - A 'Textures' folder in the path (if whitelist enabled)")
                 self.log("  - No blacklisted path components (if blacklist enabled)")
-                messagebox.showinfo("Dry Run Complete", "No normal map files found")
+                self._on_ui(messagebox.showinfo, "Dry Run Complete", "No normal map files found")
                 return
 
             # Count files
+            n_results = len(results)
             n_count = sum(1 for r in results if not r.is_nh)
             nh_count = sum(1 for r in results if r.is_nh)
-            self.log(f"Found {len(results)} normal map files ({n_count} _n.dds, {nh_count} _nh.dds)\n")
+            self.log(f"Found {n_results} normal map files ({n_count} _n.dds, {nh_count} _nh.dds)\n")
 
             # Analyze results
             total_current_size = sum(r.file_size for r in results)
             total_projected_size = sum(r.projected_size for r in results if not r.error)
-            format_stats = {}
+            format_stats = defaultdict(lambda: {'count': 0, 'size': 0})
             oversized_textures = []
             oversized_will_fix = []
             undersized_textures = []
@@ -1096,70 +1224,67 @@ class NormalMapProcessorGUI:
             all_warnings = []
             all_info_messages = []
 
+            # Only the per-action counts are reported, so don't keep per-file tuples
             action_groups = {
-                'resize_and_reformat': [],
-                'resize_only': [],
-                'reformat_only': [],
-                'no_change': [],
-                'passthrough': []
+                'resize_and_reformat': 0,
+                'resize_only': 0,
+                'reformat_only': 0,
+                'no_change': 0,
+                'passthrough': 0
             }
 
+            # Detailed conversion summary, built in the same pass
+            format_conversions = defaultdict(int)  # (source_format, target_format) -> count (actual format changes only)
+            resize_conversions = defaultdict(int)  # (original_size, new_size) -> count
+            reprocessing_only = defaultdict(int)  # (format) -> count (same format, reprocessed for Z/mipmaps)
+            combined_conversions = defaultdict(lambda: {'count': 0, 'examples': []})  # (source_fmt, target_fmt, resize_type) -> count + examples
+
+            # Read the thresholds once from the settings snapshot, not from Tk
+            # variables per file (this runs on the dry-run thread)
+            max_resolution = settings.max_resolution
+            min_resolution = settings.min_resolution
+
             for i, result in enumerate(results, 1):
                 if result.error:
-                    self.log(f"[{i}/{len(results)}] Error analyzing {result.relative_path}: {result.error}")
+                    self.log(f"[{i}/{n_results}] Error analyzing {result.relative_path}: {result.error}")
                     continue
 
                 # Update format stats
-                if result.format not in format_stats:
-                    format_stats[result.format] = {'count': 0, 'size': 0}
-                format_stats[result.format]['count'] += 1
-                format_stats[result.format]['size'] += result.file_size
+                fmt_stats = format_stats[result.format]
+                fmt_stats['count'] += 1
+                fmt_stats['size'] += result.file_size
+
+                will_resize = (result.new_width != result.width) or (result.new_height != result.height)
+                will_reformat = result.format != result.target_format
+                # Passthrough files are copied as-is
+                is_passthrough = any('Compressed passthrough' in w for w in (result.warnings or []))
 
                 # Check size warnings and whether they'll be auto-fixed
                 if result.width and result.height:
                     max_dim = max(result.width, result.height)
                     min_dim = min(result.width, result.height)
-                    will_resize = (result.new_width != result.width) or (result.new_height != result.height)
 
-                    if max_dim > self.max_resolution.get():
+                    if max_dim > max_resolution:
                         oversized_textures.append((result.relative_path, result.width, result.height))
-                        if will_resize and max(result.new_width, result.new_height) <= self.max_resolution.get():
+                        if will_resize and max(result.new_width, result.new_height) <= max_resolution:
                             oversized_will_fix.append((result.relative_path, result.width, result.height))
 
-                    if min_dim < self.min_resolution.get():
+                    if min_dim < min_resolution:
                         undersized_textures.append((result.relative_path, result.width, result.height))
-                        if will_resize and min(result.new_width, result.new_height) >= self.min_resolution.get():
+                        if will_resize and min(result.new_width, result.new_height) >= min_resolution:
                             undersized_will_fix.append((result.relative_path, result.width, result.height))
 
                     # Categorize action
-                    will_resize = (result.new_width != result.width) or (result.new_height != result.height)
-                    will_reformat = result.format != result.target_format
-
-                    # Check if this is a passthrough file (will be copied as-is)
-                    is_passthrough = any('Compressed passthrough' in w for w in (result.warnings or []))
-
                     if is_passthrough:
-                        action_groups['passthrough'].append(
-                            (result.relative_path, result.width, result.height, result.format)
-                        )
+                        action_groups['passthrough'] += 1
                     elif will_resize and will_reformat:
-                        action_groups['resize_and_reformat'].append(
-                            (result.relative_path, result.width, result.height, result.format,
-                             result.new_width, result.new_height, result.target_format)
-                        )
+                        action_groups['resize_and_reformat'] += 1
                     elif will_resize:
-                        action_groups['resize_only'].append(
-                            (result.relative_path, result.width, result.height, result.format,
-                             result.new_width, result.new_height)
-                        )
+                        action_groups['resize_only'] += 1
                     elif will_reformat:
-                        action_groups['reformat_only'].append(
-                            (result.relative_path, result.width, result.height, result.format, result.target_format)
-                        )
+                        action_groups['reformat_only'] += 1
                     else:
-                        action_groups['no_change'].append(
-                            (result.relative_path, result.width, result.height, result.format)
-                        )
+                        action_groups['no_change'] += 1
 
                 # Collect warnings/info for this file (log summary later, not per-file)
                 if result.warnings:
@@ -1170,53 +1295,36 @@ class NormalMapProcessorGUI:
                         else:
                             all_warnings.append((result.relative_path, warning))
 
-            # Build detailed conversion summary
-            format_conversions = {}  # (source_format, target_format) -> count (actual format changes only)
-            resize_conversions = {}  # (original_size, new_size) -> count
-            reprocessing_only = {}  # (format) -> count (same format, reprocessed for Z/mipmaps)
-            combined_conversions = {}  # (source_fmt, target_fmt, resize_type) -> [file_list]
-
-            for result in results:
-                if result.error:
-                    continue
-
-                will_resize = (result.new_width != result.width) or (result.new_height != result.height)
-                will_reformat = result.format != result.target_format
-                is_passthrough = any('Compressed passthrough' in w for w in (result.warnings or []))
-
                 # Track actual format conversions only
                 if will_reformat:
                     key = (result.format, result.target_format)
-                    format_conversions[key] = format_conversions.get(key, 0) + 1
+                    format_conversions[key] += 1
 
                 # Track same-format reprocessing (Z-reconstruction, mipmaps)
                 # Exclude passthrough files (they are copied as-is, not reprocessed)
                 if not will_reformat and not will_resize and not is_passthrough:
-                    if result.format not in reprocessing_only:
-                        reprocessing_only[result.format] = 0
                     reprocessing_only[result.format] += 1
 
                 # Track resize conversions
                 if result.width and result.new_width:
                     if will_resize:
                         resize_key = (f"{result.width}x{result.height}", f"{result.new_width}x{result.new_height}")
-                        resize_conversions[resize_key] = resize_conversions.get(resize_key, 0) + 1
+                        resize_conversions[resize_key] += 1
 
                 # Track combined conversions for detailed breakdown
                 # Only store first 5 examples to avoid memory/performance issues with large datasets
                 resize_type = "resize" if will_resize else "no_resize"
                 combo_key = (result.format, result.target_format, resize_type)
-                if combo_key not in combined_conversions:
-                    combined_conversions[combo_key] = {'count': 0, 'examples': []}
-                combined_conversions[combo_key]['count'] += 1
-                if len(combined_conversions[combo_key]['examples']) < 5:
-                    combined_conversions[combo_key]['examples'].append(result.relative_path)
+                combo = combined_conversions[combo_key]
+                combo['count'] += 1
+                if len(combo['examples']) < 5:
+                    combo['examples'].append(result.relative_path)
 
             # Display stats
             self.log("\n=== Current State ===")
             self.log(f"Total size: {format_size(total_current_size)}")
-            if len(results) > 0:
-                self.log(f"Average size per file: {format_size(total_current_size // len(results))}")
+            if n_results > 0:
+                self.log(f"Average size per file: {format_size(total_current_size // n_results)}")
 
             self.log("\n=== Format Breakdown (Current) ===")
             for fmt, stats in sorted(format_stats.items()):
@@ -1245,14 +1353,12 @@ class NormalMapProcessorGUI:
             if resize_conversions:
                 self.log("\n=== Resolution Changes ===")
                 # Group by scale factor
-                scale_groups = {}
+                scale_groups = defaultdict(list)
                 for (src_res, dst_res), count in resize_conversions.items():
                     src_w, src_h = map(int, src_res.split('x'))
                     dst_w, dst_h = map(int, dst_res.split('x'))
                     scale = dst_w / src_w
                     scale_str = f"{scale:.2f}x" if scale != 1.0 else "unchanged"
-                    if scale_str not in scale_groups:
-                        scale_groups[scale_str] = []
                     scale_groups[scale_str].append((src_res, dst_res, count))
 
                 for scale_str, conversions in sorted(scale_groups.items()):
@@ -1279,37 +1385,42 @@ class NormalMapProcessorGUI:
                         self.log(f"    ... and {count - 3} more")
 
             # Show actions summary
+            n_resize_and_reformat = action_groups['resize_and_reformat']
+            n_resize_only = action_groups['resize_only']
+            n_reformat_only = action_groups['reformat_only']
+            n_no_change = action_groups['no_change']
+            n_passthrough = action_groups['passthrough']
+            copy_passthrough = settings.copy_passthrough_files
+
             self.log("\n=== Summary ===")
-            total_with_changes = len(action_groups['resize_and_reformat']) + len(action_groups['resize_only']) + len(action_groups['reformat_only'])
+            total_with_changes = n_resize_and_reformat + n_resize_only + n_reformat_only
             if total_with_changes > 0:
                 self.log(f"Files to modify: {total_with_changes}")
-                if len(action_groups['resize_and_reformat']) > 0:
-                    self.log(f"  • Resize + Convert: {len(action_groups['resize_and_reformat'])}")
-                if len(action_groups['resize_only']) > 0:
-                    self.log(f"  • Resize only: {len(action_groups['resize_only'])}")
-                if len(action_groups['reformat_only']) > 0:
-                    self.log(f"  • Convert only: {len(action_groups['reformat_only'])}")
-
-            if len(action_groups['no_change']) > 0:
-                self.log(f"Files to recalculate: {len(action_groups['no_change'])} (same format/size, Z-fix + mipmaps)")
-
-            if len(action_groups['passthrough']) > 0:
-                copy_passthrough = self.copy_passthrough_files.get()
+                if n_resize_and_reformat > 0:
+                    self.log(f"  • Resize + Convert: {n_resize_and_reformat}")
+                if n_resize_only > 0:
+                    self.log(f"  • Resize only: {n_resize_only}")
+                if n_reformat_only > 0:
+                    self.log(f"  • Convert only: {n_reformat_only}")
+
+            if n_no_change > 0:
+                self.log(f"Files to recalculate: {n_no_change} (same format/size, Z-fix + mipmaps)")
+
+            if n_passthrough > 0:
                 if copy_passthrough:
-                    self.log(f"Files to pass through: {len(action_groups['passthrough'])} (will be copied)")
+                    self.log(f"Files to pass through: {n_passthrough} (will be copied)")
                 else:
-                    self.log(f"Files to pass through: {len(action_groups['passthrough'])} (will be skipped)")
+                    self.log(f"Files to pass through: {n_passthrough} (will be skipped)")
 
             # Update the final message to exclude passthrough files
-            files_to_process = len(results) - len(action_groups['passthrough'])
+            files_to_process = n_results - n_passthrough
             if files_to_process > 0:
                 self.log(f"\n{files_to_process} files will receive Z-reconstruction + mipmap regeneration.")
-            if len(action_groups['passthrough']) > 0:
-                copy_passthrough = self.copy_passthrough_files.get()
+            if n_passthrough > 0:
                 if copy_passthrough:
-                    self.log(f"{len(action_groups['passthrough'])} files already optimized (will be copied to output).")
+                    self.log(f"{n_passthrough} files already optimized (will be copied to output).")
                 else:
-                    self.log(f"{len(action_groups['passthrough'])} files already optimized (will be skipped, not in output).")
+                    self.log(f"{n_passthrough} files already optimized (will be skipped, not in output).")
 
             # Projection
             savings = total_current_size - total_projected_size
@@ -1327,10 +1438,8 @@ class NormalMapProcessorGUI:
 
             # Show automatic optimizations first (these are good things)
             if all_info_messages:
-                info_groups = {}
+                info_groups = defaultdict(list)
                 for path, info in all_info_messages:
-                    if info not in info_groups:
-                        info_groups[info] = []
                     info_groups[info].append(path)
 
                 for info, paths in info_groups.items():
@@ -1354,10 +1463,8 @@ class NormalMapProcessorGUI:
             # Display conversion/format warnings
             if all_warnings:
                 self.log(f"\n⚠ Found {len(all_warnings)} format/conversion warning(s):")
-                warning_groups = {}
+                warning_groups = defaultdict(list)
                 for path, warning in all_warnings:
-                    if warning not in warning_groups:
-                        warning_groups[warning] = []
                     warning_groups[warning].append(path)
 
                 for warning, paths in warning_groups.items():
@@ -1370,7 +1477,7 @@ class NormalMapProcessorGUI:
             if oversized_textures:
                 if len(oversized_will_fix) == len(oversized_textures):
                     # All will be fixed
-                    self.log(f"\nℹ Auto-fix: {len(oversized_textures)} texture(s) larger than {self.max_resolution.get()}px will be downscaled")
+                    self.log(f"\nℹ Auto-fix: {len(oversized_textures)} texture(s) larger than {max_resolution}px will be downscaled")
                     for path, w, h in oversized_textures[:3]:
                         self.log(f"     • {path} ({w}x{h})")
                     if len(oversized_textures) > 3:
@@ -1379,10 +1486,10 @@ class NormalMapProcessorGUI:
                     # Some will be fixed
                     unfixed = len(oversized_textures) - len(oversized_will_fix)
                     self.log(f"\nℹ Auto-fix: {len(oversized_will_fix)} of {len(oversized_textures)} oversized textures will be downscaled")
-                    self.log(f"⚠  {unfixed} will remain larger than {self.max_resolution.get()}px - adjust 'Max Resolution' if needed")
+                    self.log(f"⚠  {unfixed} will remain larger than {max_resolution}px - adjust 'Max Resolution' if needed")
                 else:
                     # None will be fixed
-                    self.log(f"\n⚠ Resolution: {len(oversized_textures)} texture(s) larger than {self.max_resolution.get()}px")
+                    self.log(f"\n⚠ Resolution: {len(oversized_textures)} texture(s) larger than {max_resolution}px")
                     for path, w, h in oversized_textures[:5]:
                         self.log(f"     • {path} ({w}x{h})")
                     if len(oversized_textures) > 5:
@@ -1395,10 +1502,9 @@ class NormalMapProcessorGUI:
                     self.log(f"\nℹ Auto-fix: {len(undersized_will_fix)} of {len(undersized_textures)} undersized textures will be upscaled")
                     unfixed = len(undersized_textures) - len(undersized_will_fix)
                     if unfixed > 0:
-                        self.log(f"⚠  {unfixed} will remain smaller than {self.min_resolution.get()}px")
+                        self.log(f"⚠  {unfixed} will remain smaller than {min_resolution}px")
                 else:
                     # Show as info only if user is downscaling
-                    settings = self.get_settings()
                     if settings.scale_factor < 1.0:
                         if settings.min_resolution > 0:
                             self.log(f"\nℹ Protection: {len(undersized_textures)} texture(s) smaller than {settings.min_resolution}px will not be downscaled")
@@ -1408,14 +1514,14 @@ class NormalMapProcessorGUI:
                                 self.log(f"     ... and {len(undersized_textures) - 5} more")
                             self.log(f"   → Protected by 'Min Resolution: {settings.min_resolution}' setting (prevents over-compression)")
                         else:
-                            self.log(f"\n⚠ Resolution: {len(undersized_textures)} texture(s) smaller than {self.min_resolution.get()}px")
+                            self.log(f"\n⚠ Resolution: {len(undersized_textures)} texture(s) smaller than {min_resolution}px")
                             for path, w, h in undersized_textures[:5]:
                                 self.log(f"     • {path} ({w}x{h})")
                             if len(undersized_textures) > 5:
                                 self.log(f"     ... and {len(undersized_textures) - 5} more")
                             self.log("   → Set 'Min Resolution: 256' to prevent over-compression when downscaling")
 
-            self.stats_label.config(
+            self._on_ui(self.stats_label.config,
                 text=f"Current: {format_size(total_current_size)} → Projected: {format_size(total_projected_size)} ({savings_percent:.1f}% savings)"
             )
 
@@ -1427,39 +1533,36 @@ class NormalMapProcessorGUI:
             if texdiag_fallbacks > 0:
                 self.log(f"Note: {texdiag_fallbacks} file(s) used texdiag fallback")
 
-            messagebox.showinfo("Dry Run Complete",
+            self._on_ui(messagebox.showinfo, "Dry Run Complete",
                 f"Current: {format_size(total_current_size)}\n"
                 f"Projected: {format_size(total_projected_size)}\n"
                 f"Estimated savings: {savings_percent:.1f}%")
 
         except Exception as e:
             self.log(f"\nError: {str(e)}")
-            messagebox.showerror("Error", f"Dry run failed: {str(e)}")
+            self._on_ui(messagebox.showerror, "Error", f"Dry run failed: {str(e)}")
             # Don't enable process button on error
             self.processing = False
-            self.analyze_btn.configure(state="normal")
-            self.export_btn.configure(state="normal")
+            self._on_ui(self.analyze_btn.configure, state="normal")
+            self._on_ui(self.export_btn.configure, state="normal")
         else:
             # Only enable process button on successful analysis
             self.processing = False
-            self.analyze_btn.configure(state="normal")
-            self.process_btn.configure(state="normal")
-            self.export_btn.configure(state="normal")
+            self._on_ui(self.analyze_btn.configure, state="normal")
+            self._on_ui(self.process_btn.configure, state="normal")
+            self._on_ui(self.export_btn.configure, state="normal")
 
-    def process_files(self):
-        """Run processing using core processor"""
+    def process_files(self, input_dir: Path, output_dir: Path):
+        """Run processing using core processor (on a worker thread, with paths read by start_processing)"""
         start_time = time.time()
         try:
             # Check if analysis has been run
             if not self.processor:
-                messagebox.showerror("Error",
+                self._on_ui(messagebox.showerror, "Error",
                     "You must run 'Dry Run (Analysis)' before processing.\n\n"
                     "This ensures optimal performance by caching file metadata.")
                 return
 
-            input_dir = Path(self.input_dir.get())
-            output_dir = Path(self.output_dir.get())
-
             n_files, nh_files = self.processor.find_normal_maps(input_dir)
             found_files = len(n_files) + len(nh_files)
 
@@ -1468,44 +1571,27 @@ class NormalMapProcessorGUI:
             self.log(f"Total: {found_files} normal map file(s)\n")
 
             if found_files == 0:
-                messagebox.showinfo("No Files", "No normal map files found")
+                self._on_ui(messagebox.showinfo, "No Files", "No normal map files found")
                 return
 
-            # Filter out passthrough files if copy_passthrough_files is disabled
-            # This matches what the processor will actually process
-            copy_passthrough = self.processor.settings.copy_passthrough_files
-            if not copy_passthrough:
-                def should_process(f):
-                    rel_path = str(f.relative_to(input_dir))
-                    cached = self.processor._get_cached_analysis(rel_path)
-                    if cached and cached.get('is_passthrough', False):
-                        return False
-                    return True
-                n_files = [f for f in n_files if should_process(f)]
-                nh_files = [f for f in nh_files if should_process(f)]
-                passthrough_count = found_files - len(n_files) - len(nh_files)
-                if passthrough_count > 0:
-                    self.log(f"Skipping {passthrough_count} passthrough file(s) (already optimized)\n")
+            # Same filter the processor applies, so progress counts match
+            n_files, nh_files = self.processor.filter_passthrough(n_files, nh_files)
+            passthrough_count = found_files - len(n_files) - len(nh_files)
+            if passthrough_count > 0:
+                self.log(f"Skipping {passthrough_count} passthrough file(s) (already optimized)\n")
 
             total_files = len(n_files) + len(nh_files)
 
             if total_files == 0:
-                messagebox.showinfo("No Files", "All files are passthrough (already optimized). Nothing to process.")
+                self._on_ui(messagebox.showinfo, "No Files", "All files are passthrough (already optimized). Nothing to process.")
                 return
 
             # Initialize progress
-            self.progress_bar["maximum"] = total_files
-            self.progress_bar["value"] = 0
-
-            # Batch GUI updates for performance
-            last_update_time = time.time()
-            last_update_count = 0
-            pending_logs = []
+            self._post_progress(value=0, maximum=total_files)
 
-            # Define progress callback
+            # Runs on the processing thread: log lines and progress are queued
+            # and applied by the Tk thread, so per-file updates are cheap
             def progress_callback(current, total, result: ProcessingResult):
-                nonlocal last_update_time, last_update_count, pending_logs
-
                 self.total_input_size += result.input_size
 
                 if result.success:
@@ -1518,49 +1604,29 @@ class NormalMapProcessorGUI:
                         size_change = result.output_size - result.input_size
                         size_change_str = f"+{format_size(size_change)}" if size_change > 0 else format_size(size_change)
 
-                        pending_logs.append(f"✓ {result.relative_path}")
-                        pending_logs.append(f"  {orig_w}×{orig_h} {result.orig_format} → {new_w}×{new_h} {result.new_format} | "
+                        self.log(f"✓ {result.relative_path}")
+                        self.log(f"  {orig_w}×{orig_h} {result.orig_format} → {new_w}×{new_h} {result.new_format} | "
                                 f"{format_size(result.input_size)} → {format_size(result.output_size)} ({size_change_str})")
                     else:
-                        pending_logs.append(f"✓ Completed: {result.relative_path}")
+                        self.log(f"✓ Completed: {result.relative_path}")
                 else:
                     self.failed_count += 1
                     error_msg = result.error_msg or 'Unknown error'
-                    pending_logs.append(f"✗ Failed: {result.relative_path} - {error_msg}")
-
-                # Update GUI periodically (every 2 seconds)
-                current_time = time.time()
-                should_update = (
-                    current_time - last_update_time >= 2.0 or  # Every 2 seconds
-                    current == total  # Always update on last file
-                )
-
-                if should_update:
-                    # Flush pending logs
-                    if pending_logs:
-                        self.log('\n'.join(pending_logs))
-                        pending_logs.clear()
+                    self.log(f"✗ Failed: {result.relative_path} - {error_msg}")
 
-                    # Update progress
-                    self.progress_bar["value"] = current
-                    self.progress_label.config(text=f"Processed {current}/{total} files")
-
-                    # Update UI
-                    self.root.update_idletasks()
-
-                    last_update_time = current_time
-                    last_update_count = current
+                self._post_progress(value=current, text=f"Processed {current}/{total} files")
 
             # Process files
             if self.processor.settings.enable_parallel and total_files > 1:
-                self.log(f"Using parallel processing: {self.processor.settings.max_workers} workers, {self.processor.settings.chunk_size_mb}MB chunks\n")
+                self.log(f"Using parallel processing: {self.processor.settings.max_workers} workers, {self.processor.settings.batches_per_worker} batches per worker\n")
             else:
                 self.log("Using sequential processing\n")
 
-            # This will use cached analysis data automatically
-            self.processor.process_files(input_dir, output_dir, progress_callback)
+            # This will use cached analysis data automatically; reuse the files found above
+            self.processor.process_files(input_dir, output_dir, progress_callback,
+                                         files=(n_files, nh_files))
 
-            self.progress_label.config(text="Processing complete!")
+            self._post_progress(text="Processing complete!")
 
             # Display final stats
             elapsed_time = time.time() - start_time
@@ -1569,7 +1635,7 @@ class NormalMapProcessorGUI:
             savings_percent = (savings / self.total_input_size * 100) if self.total_input_size > 0 else 0
 
             stats_msg = f"Files: {self.processed_count}/{total} successful | {format_size(self.total_input_size)} → {format_size(self.total_output_size)} | Saved: {format_size(savings)} ({savings_percent:.1f}%)"
-            self.stats_label.config(text=stats_msg)
+            self._on_ui(self.stats_label.config, text=stats_msg)
 
             self.log("\n=== Processing Complete ===")
             self.log(f"Found {len(nh_files)} _nh.dds file(s)")
@@ -1584,23 +1650,27 @@ class NormalMapProcessorGUI:
                 self.log(f"Average per file: {format_time(avg_time)}")
 
             # Post-processing stats
+            unchanged_skipped = getattr(self.processor, 'unchanged_skipped', 0)
+            if unchanged_skipped > 0:
+                self.log(f"Unchanged (skipped, output already up to date): {unchanged_skipped}")
+
             bgrx_converted = getattr(self.processor, 'bgrx_to_bgr24_converted', 0)
             if bgrx_converted > 0:
                 self.log("\n=== Post-Processing ===")
                 self.log(f"BGRX→BGR24 converted: {bgrx_converted} (32-bit padded → true 24-bit)")
 
             if self.failed_count > 0:
-                messagebox.showwarning("Completed with errors", f"Processing completed with {self.failed_count} failed file(s)\n\n{stats_msg}")
+                self._on_ui(messagebox.showwarning, "Completed with errors", f"Processing completed with {self.failed_count} failed file(s)\n\n{stats_msg}")
             else:
-                messagebox.showinfo("Success", f"Processing completed!\n\n{stats_msg}")
+                self._on_ui(messagebox.showinfo, "Success", f"Processing completed!\n\n{stats_msg}")
 
         except Exception as e:
             self.log(f"\nError: {str(e)}")
-            messagebox.showerror("Error", f"Processing failed: {str(e)}")
+            self._on_ui(messagebox.showerror, "Error", f"Processing failed: {str(e)}")
         finally:
             self.processing = False
-            self.analyze_btn.configure(state="normal")
-            self.process_btn.configure(state="normal")
+            self._on_ui(self.analyze_btn.configure, state="normal")
+            self._on_ui(self.process_btn.configure, state="normal")
 
 
 def main():
@@ -0,0 +1,420 @@
+"""
+Unit tests for the processor's helpers (no texconv/texdiag needed).
+
+Usage:
+    python -m pytest tests/test_processor.py
+"""
+
+import json
+import os
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path so we can import src module
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core import processor
+from src.core.normal_settings import NormalSettings
+
+
+def _touch(path: Path, data: bytes = b"DDS ") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+def _write_bc1_dds(path: Path, width: int = 256, height: int = 256) -> Path:
+    """Minimal DXT1 DDS: header plus a top-level payload of the right size"""
+    header = bytearray(128)
+    header[0:4] = b"DDS "
+    struct.pack_into("<IIII", header, 4, 124, 0x1007, height, width)
+    struct.pack_into("<II", header, 76, 32, 0x4)
+    header[84:88] = b"DXT1"
+    return _touch(path, bytes(header) + b"\0" * (width * height // 2))
+
+
+# =============================================================================
+# Discovery
+# =============================================================================
+
+def test_scan_classifies_n_and_nh(tmp_path):
+    _touch(tmp_path / "Textures" / "rock_n.dds")
+    _touch(tmp_path / "Textures" / "sub" / "Wall_NH.DDS")
+    _touch(tmp_path / "Textures" / "sub" / "deep" / "bark_N.dds", b"DDS 1234")
+    _touch(tmp_path / "Textures" / "rock.dds")
+    _touch(tmp_path / "Textures" / "rock_n.tga")
+    _touch(tmp_path / "Textures" / "rock_nhx.dds")
+
+    found = {p.relative_to(tmp_path).as_posix(): (size, is_nh)
+             for p, size, _, is_nh in processor._scan_normal_maps(tmp_path)}
+
+    assert found == {
+        "Textures/rock_n.dds": (4, False),
+        "Textures/sub/Wall_NH.DDS": (4, True),
+        "Textures/sub/deep/bark_N.dds": (8, False),
+    }
+
+
+def test_scan_does_not_follow_directory_links(tmp_path):
+    _touch(tmp_path / "Textures" / "rock_n.dds")
+    try:
+        os.symlink(tmp_path, tmp_path / "Textures" / "loop", target_is_directory=True)
+    except (OSError, NotImplementedError):
+        pytest.skip("symlinks not supported here")
+
+    found = processor._scan_normal_maps(tmp_path)
+
+    assert [p.name for p, _, _, _ in found] == ["rock_n.dds"]
+
+
+@pytest.mark.parametrize("copy_passthrough", [False, True])
+def test_filter_passthrough_uses_analysis(tmp_path, monkeypatch, copy_passthrough):
+    _write_bc1_dds(tmp_path / "in" / "Textures" / "wall_n.dds")
+    monkeypatch.chdir(tmp_path)
+    proc = processor.NormalMapProcessor(NormalSettings(
+        allow_compressed_passthrough=True, copy_passthrough_files=copy_passthrough, enable_parallel=False))
+    proc.analyze_files(Path("in"))
+
+    n_files, nh_files = proc.filter_passthrough(*proc.find_normal_maps(Path("in")))
+
+    assert len(n_files) == int(copy_passthrough) and nh_files == []
+
+
+# =============================================================================
+# Unchanged-file manifest
+# =============================================================================
+# Compressed passthrough copies need no texconv, so process_files runs for real
+
+MANIFEST = processor._MANIFEST_NAME
+
+
+def _run_passthrough(input_dir: Path, output_dir: Path, **overrides) -> processor.NormalMapProcessor:
+    settings = dict(allow_compressed_passthrough=True, copy_passthrough_files=True,
+                    skip_unchanged_files=True, enable_parallel=False)
+    settings.update(overrides)
+    proc = processor.NormalMapProcessor(NormalSettings(**settings))
+    proc.analyze_files(input_dir)
+    results = proc.process_files(input_dir, output_dir)
+    assert [r.success for r in results] == [True]
+    return proc
+
+
+@pytest.fixture
+def mod_dirs(tmp_path):
+    input_dir, output_dir = tmp_path / "in", tmp_path / "out"
+    _write_bc1_dds(input_dir / "Textures" / "wall_n.dds")
+    return input_dir, output_dir
+
+
+def test_manifest_skips_unchanged_file(mod_dirs):
+    _run_passthrough(*mod_dirs)
+    assert _run_passthrough(*mod_dirs).unchanged_skipped == 1
+
+
+def test_manifest_misses_after_settings_change(mod_dirs):
+    _run_passthrough(*mod_dirs)
+    assert _run_passthrough(*mod_dirs, invert_y=True).unchanged_skipped == 0
+    assert _run_passthrough(*mod_dirs, invert_y=True).unchanged_skipped == 1
+
+
+def test_manifest_misses_missing_or_modified_output(mod_dirs):
+    input_dir, output_dir = mod_dirs
+    output = output_dir / "Textures" / "wall_n.dds"
+    _run_passthrough(input_dir, output_dir)
+
+    output.unlink()
+    assert _run_passthrough(input_dir, output_dir).unchanged_skipped == 0
+    assert output.is_file()
+
+    output.write_bytes(b"DDS truncated")
+    assert _run_passthrough(input_dir, output_dir).unchanged_skipped == 0
+    assert output.stat().st_size == (input_dir / "Textures" / "wall_n.dds").stat().st_size
+
+    # Same size, rewritten later
+    st = output.stat()
+    os.utime(output, ns=(st.st_atime_ns, st.st_mtime_ns + 5_000_000_000))
+    assert _run_passthrough(input_dir, output_dir).unchanged_skipped == 0
+
+
+def test_manifest_misses_when_nh_rename_changes(tmp_path):
+    input_dir, output_dir = tmp_path / "in", tmp_path / "out"
+    _write_bc1_dds(input_dir / "Textures" / "wall_nh.dds")
+
+    _run_passthrough(input_dir, output_dir, auto_fix_nh_to_n=False)
+    assert sorted(os.listdir(output_dir / "Textures")) == ["wall_nh.dds"]
+
+    # BC1 has no alpha, so auto-fix now saves it as _n; the old _nh copy is removed
+    assert _run_passthrough(input_dir, output_dir, auto_fix_nh_to_n=True).unchanged_skipped == 0
+    assert sorted(os.listdir(output_dir / "Textures")) == ["wall_n.dds"]
+    assert _run_passthrough(input_dir, output_dir, auto_fix_nh_to_n=True).unchanged_skipped == 1
+
+
+def test_manifest_only_kept_while_skipping(mod_dirs):
+    input_dir, output_dir = mod_dirs
+    _run_passthrough(input_dir, output_dir)
+    assert (output_dir / MANIFEST).is_file()
+
+    _run_passthrough(input_dir, output_dir, skip_unchanged_files=False)
+    assert not (output_dir / MANIFEST).exists()
+
+
+def _read_manifest(output_dir: Path) -> dict:
+    with open(output_dir / MANIFEST, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _write_manifest(output_dir: Path, manifest: dict):
+    with open(output_dir / MANIFEST, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh)
+
+
+def test_manifest_ignores_malformed_entries(mod_dirs):
+    input_dir, output_dir = mod_dirs
+    _run_passthrough(input_dir, output_dir)
+    entry = _read_manifest(output_dir)["Textures/wall_n.dds"]
+
+    for bad in ({"key": 1}, dict(entry, new_dims="256x256"), dict(entry, output_size=None), 5):
+        _write_manifest(output_dir, {"Textures/wall_n.dds": bad})
+        assert _run_passthrough(input_dir, output_dir).unchanged_skipped == 0
+
+    _write_manifest(output_dir, ["not", "a", "dict"])
+    assert _run_passthrough(input_dir, output_dir).unchanged_skipped == 0
+
+
+def test_manifest_never_touches_files_outside_output(mod_dirs, tmp_path):
+    input_dir, output_dir = mod_dirs
+    victim = _touch(tmp_path / "victim_n.dds")
+    _run_passthrough(input_dir, output_dir)
+    entry = _read_manifest(output_dir)["Textures/wall_n.dds"]
+
+    # Entries pointing outside the output folder are dropped on load...
+    for outside in ("../victim_n.dds", str(victim)):
+        _write_manifest(output_dir, {"Textures/wall_n.dds": dict(entry, output=outside)})
+        assert _run_passthrough(input_dir, output_dir).unchanged_skipped == 0
+        assert victim.is_file()
+
+    # ...and the stale-output cleanup checks again before deleting
+    proc = _run_passthrough(input_dir, output_dir)
+    result = processor.ProcessingResult(success=True, relative_path="Textures/wall_n.dds", input_size=1,
+                                        output_size=1, new_dims=(256, 256), new_format="BC1/DXT1")
+    proc._save_manifest(output_dir, {"Textures/wall_n.dds": dict(entry, output="../victim_n.dds")},
+                        [result], input_dir, proc.settings.to_dict(), {})
+    assert victim.is_file()
+
+
+def test_manifest_forgets_deleted_inputs(mod_dirs):
+    input_dir, output_dir = mod_dirs
+    extra = _write_bc1_dds(input_dir / "Textures" / "gone_n.dds")
+    proc = processor.NormalMapProcessor(NormalSettings(
+        allow_compressed_passthrough=True, copy_passthrough_files=True,
+        skip_unchanged_files=True, enable_parallel=False))
+    proc.analyze_files(input_dir)
+    proc.process_files(input_dir, output_dir)
+    assert sorted(_read_manifest(output_dir)) == ["Textures/gone_n.dds", "Textures/wall_n.dds"]
+
+    extra.unlink()
+    _run_passthrough(input_dir, output_dir)
+    assert sorted(_read_manifest(output_dir)) == ["Textures/wall_n.dds"]
+
+
+def test_skip_unchanged_is_off_by_default():
+    assert NormalSettings().skip_unchanged_files is False
+
+
+# =============================================================================
+# Size projection
+# =============================================================================
+
+@pytest.mark.parametrize("width, height, target_format, expected", [
+    # BC1 4x4: one 8-byte block per mip (4x4, 2x2, 1x1) + 128-byte header
+    (4, 4, "BC1/DXT1", 3 * 8 + 128),
+    # BC5 256x256: 64x64 blocks at mip 0, padded to whole blocks below 4x4
+    (256, 256, "BC5/ATI2", (4096 + 1024 + 256 + 64 + 16 + 4 + 1 + 1 + 1) * 16 + 128),
+    # Uncompressed, non-square: 8x2, 4x1, 2x1, 1x1 at 24 bits per pixel
+    (8, 2, "BGR", (16 + 4 + 2 + 1) * 3 + 128),
+    (2, 2, "BGRA", (4 + 1) * 4 + 128),
+])
+def test_estimate_output_size_sums_mip_chain(width, height, target_format, expected):
+    assert processor._estimate_output_size(width, height, target_format) == expected
+
+
+# =============================================================================
+# Batching
+# =============================================================================
+
+def test_create_file_batches_balances_cost():
+    costs = [10, 9, 8, 1, 1, 1, 1, 5, 5]
+    tasks = [f"task{i}" for i in range(len(costs))]
+
+    batches = processor._create_file_batches(tasks, costs, n_workers=1, batches_per_worker=3)
+
+    assert len(batches) == 3
+    assert sorted(t for batch in batches for t in batch) == sorted(tasks)
+    totals = [sum(costs[tasks.index(t)] for t in batch) for batch in batches]
+    assert max(totals) - min(totals) <= max(costs)
+    # Most expensive tasks start first in their batch
+    assert sorted(batch[0] for batch in batches) == ["task0", "task1", "task2"]
+
+
+def test_create_file_batches_never_makes_empty_batches():
+    batches = processor._create_file_batches(["a", "b"], [1, 1], n_workers=8, batches_per_worker=4)
+    assert sorted(batches) == [["a"], ["b"]]
+
+
+# =============================================================================
+# Shared texconv calls
+# =============================================================================
+
+SETTINGS = NormalSettings().to_dict()
+
+
+def _conversion(tmp_path: Path, name: str, subdir: str = "Textures", target_format: str = "BC5/ATI2"):
+    plan = processor._OutputPlan(new_width=256, new_height=256, target_format=target_format)
+    job = (tmp_path / "in" / subdir / name, tmp_path / "out" / subdir / name, (256, 256), "BGRA", plan)
+    return processor.ProcessingResult(success=False, relative_path=f"{subdir}/{name}", input_size=1), job
+
+
+def test_singleproc_only_inside_the_pool(tmp_path):
+    _, (_, _, dims, _, plan) = _conversion(tmp_path, "tex_n.dds")
+    settings = dict(SETTINGS, enable_parallel=True, max_workers=4)
+
+    assert "-singleproc" in processor._texconv_options(settings, plan, dims, in_pool=True)
+    assert "-singleproc" not in processor._texconv_options(settings, plan, dims)
+    assert "-singleproc" not in processor._texconv_options(dict(settings, max_workers=1), plan, dims, in_pool=True)
+
+
+def test_group_texconv_jobs_splits_by_options_and_folder(tmp_path):
+    pending = ([_conversion(tmp_path, f"a{i}_n.dds") for i in range(3)]
+               + [_conversion(tmp_path, f"b{i}_n.dds", target_format="BC1/DXT1") for i in range(2)]
+               + [_conversion(tmp_path, f"c{i}_n.dds", subdir="Textures/sub") for i in range(2)])
+
+    chunks = processor._group_texconv_jobs(pending, SETTINGS)
+
+    names = sorted(sorted(job[0].name[0] for _, job in chunk) for chunk in chunks)
+    assert names == [["a", "a", "a"], ["b", "b"], ["c", "c"]]
+
+
+def test_group_texconv_jobs_limits_files_per_call(tmp_path):
+    pending = [_conversion(tmp_path, f"tex{i}_n.dds") for i in range(processor._TEXCONV_MAX_FILES_PER_CALL + 5)]
+
+    chunks = processor._group_texconv_jobs(pending, SETTINGS)
+
+    assert [len(chunk) for chunk in chunks] == [processor._TEXCONV_MAX_FILES_PER_CALL, 5]
+
+
+def test_group_texconv_jobs_limits_command_line_length(tmp_path, monkeypatch):
+    pending = [_conversion(tmp_path, f"tex{i}_n.dds") for i in range(6)]
+    path_chars = len(str(pending[0][1][0].absolute())) + 3
+    monkeypatch.setattr(processor, "_TEXCONV_MAX_CMDLINE_CHARS", path_chars * 2)
+
+    chunks = processor._group_texconv_jobs(pending, SETTINGS)
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 2]
+
+
+def test_run_texconv_group_makes_one_call(tmp_path, monkeypatch):
+    chunk = [_conversion(tmp_path, f"tex{i}_n.dds") for i in range(3)]
+    calls = []
+    monkeypatch.setattr(processor, "_run_texconv_quiet", lambda cmd, timeout: calls.append((cmd, timeout)) or 0)
+    monkeypatch.setattr(processor, "_finish_output", lambda src, dst, plan: {
+        'output_size': 100, 'new_w': plan.new_width, 'new_h': plan.new_height, 'new_format': plan.target_format})
+
+    processor._run_texconv_group(chunk, SETTINGS)
+
+    assert len(calls) == 1
+    cmd, timeout = calls[0]
+    assert timeout == 3 * processor._TEXCONV_TIMEOUT_PER_FILE
+    assert cmd[cmd.index("-o") + 1] == str((tmp_path / "out" / "Textures").absolute())
+    assert cmd[-3:] == [str(job[0].absolute()) for _, job in chunk]
+    assert all(result.success and result.output_size == 100 for result, _ in chunk)
+
+
+def test_run_texconv_group_falls_back_to_one_call_per_file(tmp_path, monkeypatch):
+    chunk = [_conversion(tmp_path, f"tex{i}_n.dds") for i in range(3)]
+    monkeypatch.setattr(processor, "_run_texconv_quiet", lambda cmd, timeout: 1)
+    rerun = []
+
+    def fake_run_file_job(result, job, settings, in_pool=False):
+        rerun.append(job[0].name)
+        result.success = job[0].name != "tex1_n.dds"
+        if not result.success:
+            result.error_msg = "texconv failed"
+    monkeypatch.setattr(processor, "_run_file_job", fake_run_file_job)
+
+    processor._run_texconv_group(chunk, SETTINGS)
+
+    assert rerun == ["tex0_n.dds", "tex1_n.dds", "tex2_n.dds"]
+    assert [result.success for result, _ in chunk] == [True, False, True]
+    assert chunk[1][0].error_msg == "texconv failed"
+
+
+def _fake_group_texconv(chunk, finished, timed_out=False):
+    """texconv stand-in that writes complete outputs for the named files, a truncated one for the rest"""
+    def run(cmd, timeout):
+        for _, (src, dst, _, _, plan) in chunk:
+            out = _write_bc1_dds(dst.parent / src.name, plan.new_width, plan.new_height)
+            if src.name not in finished:
+                with open(out, "r+b") as f:
+                    f.truncate(1000)
+        if timed_out:
+            raise processor.subprocess.TimeoutExpired(cmd, timeout)
+        return 1
+    return run
+
+
+def test_run_texconv_group_reruns_only_unfinished_files(tmp_path, monkeypatch):
+    chunk = [_conversion(tmp_path, f"tex{i}_n.dds", target_format="BC1/DXT1") for i in range(3)]
+    monkeypatch.setattr(processor, "_run_texconv_quiet", _fake_group_texconv(chunk, {"tex0_n.dds", "tex2_n.dds"}))
+    rerun = []
+
+    def fake_run_file_job(result, job, settings, in_pool=False):
+        assert not (job[1].parent / job[0].name).exists()
+        rerun.append(job[0].name)
+        result.success = True
+    monkeypatch.setattr(processor, "_run_file_job", fake_run_file_job)
+
+    processor._run_texconv_group(chunk, SETTINGS)
+
+    assert rerun == ["tex1_n.dds"]
+    assert all(result.success for result, _ in chunk)
+    assert (tmp_path / "out" / "Textures" / "tex0_n.dds").exists()
+
+
+def test_run_texconv_group_timeout_distrusts_newest_output(tmp_path, monkeypatch):
+    chunk = [_conversion(tmp_path, f"tex{i}_n.dds", target_format="BC1/DXT1") for i in range(3)]
+    monkeypatch.setattr(processor, "_run_texconv_quiet",
+                        _fake_group_texconv(chunk, {"tex0_n.dds", "tex1_n.dds"}, timed_out=True))
+    out_dir = tmp_path / "out" / "Textures"
+    rerun = []
+
+    def fake_run_file_job(result, job, settings, in_pool=False):
+        rerun.append(job[0].name)
+    monkeypatch.setattr(processor, "_run_file_job", fake_run_file_job)
+    real_mtime = processor._texconv_output_mtime
+    # Give each output a distinct mtime in write order
+    monkeypatch.setattr(processor, "_texconv_output_mtime", lambda job, after: (
+        None if real_mtime(job, after) is None else int(job[0].name[3])))
+
+    processor._run_texconv_group(chunk, SETTINGS)
+
+    assert rerun == ["tex1_n.dds", "tex2_n.dds"]
+    assert chunk[0][0].success
+    assert not (out_dir / "tex2_n.dds").exists()
+
+
+# =============================================================================
+# Header info
+# =============================================================================
+
+def test_parser_stats_count_cached_reads(tmp_path):
+    dds = _write_bc1_dds(tmp_path / "Textures" / "wall_n.dds", 64, 32)
+
+    processor.reset_parser_stats()
+    assert processor._get_dds_info(dds) == ((64, 32), "BC1/DXT1")
+    processor.reset_parser_stats()
+    assert processor._get_dds_info(dds) == ((64, 32), "BC1/DXT1")
+
+    assert processor.get_parser_stats() == (1, 0)
@@ -76,7 +76,7 @@ def load_settings_from_dict(settings_dict: dict) -> ProcessingSettings:
         resize_method=settings_dict.get('resize_method', 'CUBIC'),
         enable_parallel=settings_dict.get('enable_parallel', True),
         max_workers=settings_dict.get('max_workers', 4),
-        chunk_size_mb=settings_dict.get('chunk_size_mb', 75),
+        batches_per_worker=settings_dict.get('batches_per_worker', 4),
         preserve_compressed_format=settings_dict.get('preserve_compressed_format', True),
         auto_fix_nh_to_n=settings_dict.get('auto_fix_nh_to_n', True),
         auto_optimize_n_alpha=settings_dict.get('auto_optimize_n_alpha', True),
@@ -72,7 +72,7 @@ def load_settings_from_dict(settings_dict: dict) -> RegularSettings:
         atlas_max_resolution=settings_dict.get('atlas_max_resolution', 4096),
         enable_parallel=settings_dict.get('enable_parallel', True),
         max_workers=settings_dict.get('max_workers', 4),
-        chunk_size_mb=settings_dict.get('chunk_size_mb', 75),
+        batches_per_worker=settings_dict.get('batches_per_worker', 4),
         # Regular texture specific
         small_texture_threshold=settings_dict.get('small_texture_threshold', 128),
         allow_well_compressed_passthrough=settings_dict.get('allow_well_compressed_passthrough', True),
@@ -30,7 +30,7 @@ class BaseProcessingSettings:
     # Performance settings
     enable_parallel: bool = True
     max_workers: int = max(1, cpu_count() - 1)
-    chunk_size_mb: int = 75
+    batches_per_worker: int = 4  # Work batches queued per worker (more = better load balancing)
 
     def to_dict(self) -> dict:
         """Convert settings to dictionary for multiprocessing"""
@@ -13,6 +13,7 @@ Supported formats:
 """
 
 import struct
+import threading
 from pathlib import Path
 from typing import Optional, Tuple
 
@@ -23,6 +24,8 @@ import numpy as np
 # =============================================================================
 _fast_parser_hits = 0
 _texdiag_fallbacks = 0
+# Analysis reads headers from a thread pool; += on a global is not atomic
+_stats_lock = threading.Lock()
 
 
 def get_parser_stats() -> Tuple[int, int]:
@@ -31,26 +34,30 @@ def get_parser_stats() -> Tuple[int, int]:
     Returns:
         (fast_parser_hits, texdiag_fallbacks)
     """
-    return _fast_parser_hits, _texdiag_fallbacks
+    with _stats_lock:
+        return _fast_parser_hits, _texdiag_fallbacks
 
 
 def reset_parser_stats():
     """Reset parser statistics to zero."""
     global _fast_parser_hits, _texdiag_fallbacks
-    _fast_parser_hits = 0
-    _texdiag_fallbacks = 0
+    with _stats_lock:
+        _fast_parser_hits = 0
+        _texdiag_fallbacks = 0
 
 
 def _increment_fast_parser_hits():
     """Increment the fast parser hit counter."""
     global _fast_parser_hits
-    _fast_parser_hits += 1
+    with _stats_lock:
+        _fast_parser_hits += 1
 
 
 def _increment_texdiag_fallbacks():
     """Increment the texdiag fallback counter."""
     global _texdiag_fallbacks
-    _texdiag_fallbacks += 1
+    with _stats_lock:
+        _texdiag_fallbacks += 1
 
 
 # FourCC codes for pixel formats (from dds.ksy pixel_formats enum)
@@ -1,13 +1,23 @@
 """Shared utility functions for texture optimizers"""
 
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Tuple, Optional
 
 
+_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+
+
+# The GUIs format several sizes per logged file and the run totals repeatedly
+@lru_cache(maxsize=4096)
 def format_size(bytes_size: int) -> str:
     """Format file size in human-readable format"""
-    for unit in ['B', 'KB', 'MB', 'GB']:
+    if isinstance(bytes_size, int):
+        # Unit straight from the bit length: each unit is 10 more bits
+        unit = min(4, (bytes_size.bit_length() - 1) // 10) if bytes_size > 0 else 0
+        return f"{bytes_size / (1 << (10 * unit)):.2f} {_SIZE_UNITS[unit]}"
+    for unit in _SIZE_UNITS[:4]:
         if bytes_size < 1024.0:
             return f"{bytes_size:.2f} {unit}"
         bytes_size /= 1024.0
@@ -149,11 +159,8 @@ def _round_down_to_power_of_2(n: int) -> int:
     """Round down to nearest power of 2."""
     if n <= 0:
         return 1
-    # Find highest set bit position
-    power = 1
-    while power * 2 <= n:
-        power *= 2
-    return power
+    # Highest set bit
+    return 1 << (n.bit_length() - 1)
 
 
 def calculate_new_dimensions(